@@ -1,15 +1,17 @@
 import math
-from typing import List
+from typing import List, Optional
 
-from physics import Vector, Chain
+import numpy as np
+from physics import ArrayChain, Vector
 
 
 class BaseCreature:
-    spine: Chain
+    spine: ArrayChain
     body_width: List[float]
 
     def __init__(self, origin: Vector, scale: float = 1.0) -> None:
         self.scale = scale
+        self._body_widths: Optional[np.ndarray] = None
 
     def resolve(self, pos: Vector) -> None:
         self.spine.resolve(pos)
@@ -20,7 +22,7 @@ class BaseCreature:
             angle_offset: float,
             length_offset: float,
     ) -> float:
-        return self.spine.joints[i].x \
+        return self.spine.joints[i, 0] \
             + math.cos(self.spine.angles[i] + angle_offset) \
             * (self.body_width[i] + length_offset)
 
@@ -30,6 +32,27 @@ class BaseCreature:
             angle_offset: float,
             length_offset: float,
     ) -> float:
-        return self.spine.joints[i].y \
+        return self.spine.joints[i, 1] \
             + math.sin(self.spine.angles[i] + angle_offset) \
             * (self.body_width[i] + length_offset)
+
+    def get_positions(
+            self,
+            indices: np.ndarray,
+            angle_offsets: np.ndarray,
+            length_offset: float,
+    ) -> np.ndarray:
+        """
+        Vectorized :meth:`get_pos_x` and :meth:`get_pos_y` for several spine
+        joints at once, returns an array of shape ``(len(indices), 2)``.
+        ``body_width`` is converted to an array on the first call, it must
+        not change afterwards.
+        """
+        if self._body_widths is None:
+            self._body_widths = np.asarray(self.body_width, dtype=np.float64)
+        angles = self.spine.angles[indices] + angle_offsets
+        length = self._body_widths[indices] + length_offset
+        positions = self.spine.joints[indices].copy()
+        positions[:, 0] += np.cos(angles) * length
+        positions[:, 1] += np.sin(angles) * length
+        return positions
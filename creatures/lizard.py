@@ -1,6 +1,9 @@
 import math
 
-from physics.chain import Chain
+import numpy as np
+
+from physics.array_chain import ArrayChain
+from physics.chain_batch import ChainBatch
 from physics.vector import Vector
 from .BaseCreature import BaseCreature
 
@@ -12,7 +15,7 @@ class Lizard(BaseCreature):
             scale: float = 1.0
     ) -> None:
         super().__init__(origin, scale)
-        self.spine = Chain(
+        self.spine = ArrayChain(
             origin=origin,
             joint_count=18,
             link_size=[
@@ -21,37 +24,43 @@ class Lizard(BaseCreature):
                     0.6, 0.6, 0.6, 0.6, 0.6, 0.6, 0.6, 0.6, 0.6
                 ]
             ],
-            angle_constraint=math.pi / 8
+            angle_constraint=math.pi / 8,
+            trig_free=True
         )
 
+        side = np.array([1, -1, 1, -1])
         self.arms = [
-            Chain(origin, 3, 52 * self.scale) for _ in range(4)
+            ArrayChain(origin, 3, 52 * self.scale, bend=bend)
+            for bend in side.tolist()
         ]
-        self.arm_desired = [Vector(0, 0) for _ in range(4)]
+        self._arm_chains = ChainBatch(self.arms)
+        self.arm_desired = np.zeros((4, 2))
+        self._arm_body_index = np.array([3, 3, 6, 6])
+        self._arm_reach_angle = np.array([
+            math.pi / 4, math.pi / 4, math.pi / 3, math.pi / 3
+        ]) * side
+        self._arm_anchor_angle = math.pi / 2 * side
         self.body_width = [
             70 * self.scale * i for i in [
                 0.70, 1.00, 0.50, 1.00, 1.00, 1.00, 1.00, 0.70, 0.50,
                 0.35, 0.30, 0.25, 0.23, 0.21, 0.20, 0.20, 0.20, 0.10
             ]
         ]
-        self.resolve(self.spine.joints[0])
+        self.resolve(self.spine.joint(0))
 
     def resolve(self, pos: Vector) -> None:
         super().resolve(pos)
 
-        for i in range(len(self.arms)):
-            side = 1 if i % 2 == 0 else -1
-            body_index = 3 if i < 2 else 6
-            angle = math.pi / 4 if i < 2 else math.pi / 3
-            desired_pos = Vector(
-                self.get_pos_x(body_index, angle * side, 80 * self.scale),
-                self.get_pos_y(body_index, angle * side, 80 * self.scale)
-            )
-            if desired_pos.dist(self.arm_desired[i]) > 200 * self.scale:
-                self.arm_desired[i] = desired_pos
-            x = self.get_pos_x(body_index, math.pi / 2 * side, -35 * self.scale)
-            y = self.get_pos_y(body_index, math.pi / 2 * side, -35 * self.scale)
-            anchor = Vector(x, y)
-            interp = Vector.lerp(
-                self.arms[i].joints[0], self.arm_desired[i], 1)
-            self.arms[i].fabrik_resolve(interp, anchor)
+        desired_pos = self.get_positions(
+            self._arm_body_index, self._arm_reach_angle, 80 * self.scale)
+        delta = desired_pos - self.arm_desired
+        moved = np.hypot(delta[:, 0], delta[:, 1]) > 200 * self.scale
+        self.arm_desired[moved] = desired_pos[moved]
+        anchor = self.get_positions(
+            self._arm_body_index, self._arm_anchor_angle, -35 * self.scale)
+        # with four arms, looping the scalar solver is faster than the array
+        # operations of ChainBatch.fabrik_resolve, which only pay off on
+        # large stacks. The batch still holds the joints of every arm.
+        for arm, target, pin in zip(
+                self.arms, self.arm_desired.tolist(), anchor.tolist()):
+            arm.fabrik_resolve(Vector(*target), Vector(*pin))
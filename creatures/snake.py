@@ -1,17 +1,18 @@
 import math
 
 from creatures.BaseCreature import BaseCreature
-from physics import Vector, Chain
+from physics import ArrayChain, Vector
 
 
 class Snake(BaseCreature):
     def __init__(self, origin: Vector, scale: float = 1.0) -> None:
         super().__init__(origin, scale)
-        self.spine = Chain(
+        self.spine = ArrayChain(
             origin=origin,
             joint_count=48,
             link_size=64 * scale,
             angle_constraint=math.pi / 8,
+            trig_free=True
         )
         self.body_width = [
             (64 - i) * scale for i in range(48)
@@ -5,6 +5,9 @@ from physics import Vector
 
 
 class BaseContributionMap:
+    # theme following the color scheme preferred by the viewer
+    AUTO_THEME = "auto"
+
     def __init__(self, days: List[DailyContribution], theme: str) -> None:
         self._days = days
         self.theme = theme
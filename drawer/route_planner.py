@@ -0,0 +1,178 @@
+import time
+from itertools import groupby
+from typing import List
+
+import numpy as np
+
+from drawer.base_contribution_map import BaseContributionMap
+from github_user_contrib import DailyContribution
+from physics import Vector
+
+
+class RoutePlanner:
+    """
+    Plans the whole visiting order of the contribution days before the
+    simulation starts, minimizing the length of the path between cell
+    centers: a nearest neighbour tour is improved with 2-opt and Or-opt moves
+    until no move shortens it or the time budget runs out.\n
+
+    With ``respect_tiers`` the days are visited by decreasing quartile, and
+    only the order within each quartile is optimized.
+    """
+
+    def __init__(
+            self,
+            contribution_map: BaseContributionMap,
+            respect_tiers: bool = True,
+            time_budget: float = 0.5
+    ) -> None:
+        """
+        Parameters
+        ----------
+        contribution_map: `BaseContributionMap`
+            Map used to place the days
+        respect_tiers: `bool`
+            Visit higher quartiles first
+        time_budget: `float`
+            Seconds that can be spent improving the route
+        """
+        self._map = contribution_map
+        self._respect_tiers = respect_tiers
+        self._time_budget = time_budget
+
+    def plan(
+            self,
+            days: List[DailyContribution],
+            start: Vector
+    ) -> List[DailyContribution]:
+        if not days:
+            return []
+        if self._respect_tiers:
+            days = sorted(days, key=lambda d: -d.quartile)
+            tiers = [
+                list(tier) for _, tier in groupby(days, lambda d: d.quartile)
+            ]
+        else:
+            tiers = [list(days)]
+
+        route = []
+        position = (start.x, start.y)
+        started = time.perf_counter()
+        planned = 0
+        for tier in tiers:
+            planned += len(tier)
+            deadline = started + self._time_budget * planned / len(days)
+            points = np.array(
+                [position] + [
+                    self._map.cell_center(d.week_number, d.day_number)
+                    for d in tier
+                ],
+                dtype=np.float64
+            )
+            order = _plan_path(points, deadline)
+            route.extend(tier[i - 1] for i in order[1:])
+            position = tuple(points[order[-1]])
+        return route
+
+    def route_length(
+            self,
+            route: List[DailyContribution],
+            start: Vector
+    ) -> float:
+        points = np.array(
+            [(start.x, start.y)] + [
+                self._map.cell_center(d.week_number, d.day_number)
+                for d in route
+            ],
+            dtype=np.float64
+        )
+        steps = np.diff(points, axis=0)
+        return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
+
+
+def _plan_path(points: np.ndarray, deadline: float) -> np.ndarray:
+    """
+    Open path over ``points`` starting at ``points[0]``, returned as an
+    array of indices that starts with ``0``
+    """
+    delta = points[:, None, :] - points[None, :, :]
+    dist = np.hypot(delta[..., 0], delta[..., 1])
+    route = _nearest_neighbour(dist)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = _two_opt(route, dist, deadline)
+        improved = _or_opt(route, dist, deadline) or improved
+    return route
+
+
+def _nearest_neighbour(dist: np.ndarray) -> np.ndarray:
+    n = dist.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    route = np.zeros(n, dtype=np.int64)
+    visited[0] = True
+    for k in range(1, n):
+        candidates = np.where(visited, np.inf, dist[route[k - 1]])
+        route[k] = np.argmin(candidates)
+        visited[route[k]] = True
+    return route
+
+
+def _two_opt(route: np.ndarray, dist: np.ndarray, deadline: float) -> bool:
+    """
+    Reverses ``route[i + 1:j + 1]`` whenever that shortens the path, the
+    last node has no outgoing edge
+    """
+    improved = False
+    n = len(route)
+    for i in range(n - 2):
+        if time.perf_counter() > deadline:
+            break
+        a, b = route[i], route[i + 1]
+        ends = route[i + 2:]
+        delta = dist[a, ends] - dist[a, b]
+        delta[:-1] += dist[b, route[i + 3:]] - dist[ends[:-1], route[i + 3:]]
+        k = int(np.argmin(delta))
+        if delta[k] < -1e-9:
+            route[i + 1:i + k + 3] = route[i + 1:i + k + 3][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt(route: np.ndarray, dist: np.ndarray, deadline: float) -> bool:
+    """
+    Moves segments of up to three nodes, in either orientation, to the
+    position where they shorten the path the most
+    """
+    improved = False
+    for length in (1, 2, 3):
+        s = 1
+        while s + length <= len(route):
+            if time.perf_counter() > deadline:
+                return improved
+            segment = route[s:s + length]
+            first, last = segment[0], segment[-1]
+            prev = route[s - 1]
+            has_next = s + length < len(route)
+            removal = dist[prev, first]
+            if has_next:
+                nxt = route[s + length]
+                removal += dist[last, nxt] - dist[prev, nxt]
+            rest = np.concatenate([route[:s], route[s + length:]])
+            u, v = rest, rest[1:]
+            forward = dist[u, first]
+            backward = dist[u, last]
+            forward[:-1] += dist[last, v] - dist[u[:-1], v]
+            backward[:-1] += dist[first, v] - dist[u[:-1], v]
+            k_forward = int(np.argmin(forward))
+            k_backward = int(np.argmin(backward))
+            if forward[k_forward] <= backward[k_backward]:
+                k, insertion = k_forward, forward[k_forward]
+            else:
+                k, insertion = k_backward, backward[k_backward]
+                segment = segment[::-1]
+            if insertion < removal - 1e-9:
+                route[:] = np.concatenate(
+                    [rest[:k + 1], segment, rest[k + 1:]])
+                improved = True
+            s += 1
+    return improved
@@ -1,10 +1,16 @@
 from .chain import Chain
 from .contribution_map import ContributionMap
 from .lizard import Lizard
+from .number_format import NumberFormat
+from .render_options import RenderOptions
+from .stream_writer import StreamDrawing
 
 
 __all__ = [
     'Chain',
     'Lizard',
-    'ContributionMap'
+    'ContributionMap',
+    'NumberFormat',
+    'RenderOptions',
+    'StreamDrawing'
 ]
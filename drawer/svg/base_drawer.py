@@ -1,12 +1,23 @@
+import json
+import os
 import secrets
 import string
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import svgwrite
 
+from .frame_buffer import FrameBuffer, MemmapFrameBuffer
+from .keyframes import select_keyframes
+from .number_format import NumberFormat
+from .parallel import map_tracks
+
 
 class BaseDrawer:
     def __init__(self):
-        self._frames = []
+        self._tracks: Dict[str, Union[FrameBuffer, MemmapFrameBuffer]] = {}
+        self._frame_store: Optional[str] = None
+        self._recorded = 0
         self._fps = 60
         self._draw_group_name: str = "Group"
         self._id = ''.join(
@@ -15,39 +26,240 @@ class BaseDrawer:
         )
         self._duration = 0
         self._key_times_str = ''
-        self._frames_to_use = self._frames
+        self._frame_skip = 1
         self._n_frames = 0
+        self._max_error: Optional[float] = None
+        self._spline = False
+        self._precision = 2
+        self._number_format = NumberFormat(self._precision)
+        self._workers: Optional[int] = None
+        self._tick_frame: Optional[Dict[str, np.ndarray]] = None
 
-    def start_recording(self, fps: int = 60) -> None:
-        self._frames = []
+    def start_recording(
+            self,
+            fps: int = 60,
+            frame_store: Optional[str] = None
+    ) -> None:
+        """
+        Starts a new recording. With ``frame_store`` the frames of every track
+        are streamed to memory mapped files instead of being kept in memory,
+        in a subdirectory of ``frame_store`` named after the id of the
+        drawer so that several drawers can share the store.
+        """
+        self._close_tracks()
+        self._tracks = {}
+        self._frame_store = None
+        if frame_store is not None:
+            self._frame_store = os.path.join(frame_store, self._id)
+            os.makedirs(self._frame_store, exist_ok=True)
+        self._recorded = 0
         self._fps = max(1, fps)
+        self._tick_frame = None
 
-    def record_frame(self) -> None:
+    @property
+    def duration(self) -> float:
+        """
+        Duration in seconds of the recorded animation
+        """
+        return self._recorded / self._fps
+
+    def capture_frame(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the points of every track in the current state, as arrays of
+        shape ``(points, 2)``
+        """
         raise NotImplementedError()
 
+    def record_frame(self) -> None:
+        self._append_frame(self.capture_frame())
+
+    def record_tick(self, keyframes: List[float], interpolate: bool) -> None:
+        """
+        Records the keyframes that fall within the last simulation tick, as
+        returned by :meth:`physics.SimulationClock.tick`. With
+        ``interpolate`` the state of every tick is kept so that keyframes
+        between two ticks are linearly interpolated.
+        """
+        if not keyframes and not interpolate:
+            return
+        frame = self.capture_frame()
+        for alpha in keyframes:
+            if alpha >= 1 or self._tick_frame is None:
+                self._append_frame(frame)
+            else:
+                self._append_frame({
+                    name: self._tick_frame[name]
+                    + (points - self._tick_frame[name]) * alpha
+                    for name, points in frame.items()
+                })
+        self._tick_frame = frame if interpolate else None
+
+    def _append_frame(self, frame: Dict[str, np.ndarray]) -> None:
+        for name, points in frame.items():
+            track = self._tracks.get(name)
+            if track is None:
+                track = self._tracks[name] = self._new_track(name, len(points))
+            track.append(points)
+        self._recorded += 1
+
+    def _new_track(
+            self,
+            name: str,
+            points: int
+    ) -> Union[FrameBuffer, MemmapFrameBuffer]:
+        if self._frame_store is None:
+            return FrameBuffer(points)
+        return MemmapFrameBuffer.create(
+            os.path.join(self._frame_store, f"{name}.f64"), points)
+
+    def _close_tracks(self) -> None:
+        for track in self._tracks.values():
+            if isinstance(track, MemmapFrameBuffer):
+                track.close()
+
+    def save_frames(self, directory: str) -> str:
+        """
+        Persists the recorded frames to a subdirectory of ``directory`` named
+        after the id of the drawer, and returns its path, so that they can
+        be rendered again with :meth:`load_frames` without simulating
+        """
+        directory = os.path.join(directory, self._id)
+        os.makedirs(directory, exist_ok=True)
+        for name, track in self._tracks.items():
+            track.save(os.path.join(directory, f"{name}.f64"))
+        with open(os.path.join(directory, "frames.json"), "w") as f:
+            json.dump({
+                "id": self._id,
+                "fps": self._fps,
+                "frames": self._recorded,
+                "tracks": {
+                    name: track.points for name, track in self._tracks.items()
+                }
+            }, f)
+        return directory
+
+    def load_frames(self, directory: str) -> None:
+        """
+        Replaces the recording with the frames saved by :meth:`save_frames`,
+        memory mapped from ``directory``, the path it returned. The drawer
+        takes the id of the saved one.
+        """
+        with open(os.path.join(directory, "frames.json")) as f:
+            metadata = json.load(f)
+        self._close_tracks()
+        self._fps = metadata["fps"]
+        self._recorded = metadata["frames"]
+        self._frame_store = directory
+        self._id = metadata.get("id", self._id)
+        self._tick_frame = None
+        self._tracks = {
+            name: MemmapFrameBuffer(
+                os.path.join(directory, f"{name}.f64"),
+                points,
+                self._recorded
+            )
+            for name, points in metadata["tracks"].items()
+        }
+
+    def _track(self, name: str) -> np.ndarray:
+        """
+        Frames of a track used by :meth:`to_group`, of shape
+        ``(frames, points, 2)``
+        """
+        return self._tracks[name].frames[::self._frame_skip]
+
+    def _keyframes(
+            self,
+            track: np.ndarray
+    ) -> Tuple[List[int], Dict[str, str]]:
+        """
+        Frames of ``track``, of shape ``(frames, points, 2)``, that an element
+        animated along it has to emit, and the timing attributes of its
+        animation. Every frame is kept unless :meth:`to_group` was given a
+        ``max_error``.
+        """
+        return select_keyframes(
+            track, self._key_times_str, self._max_error, self._spline)
+
+    def _animation_values(
+            self,
+            tracks: Sequence[Tuple[np.ndarray, str]]
+    ) -> List[Tuple[List[str], Dict[str, str]]]:
+        """
+        ``values`` and timing attributes of the animations along each
+        ``(track, template)`` of ``tracks``, every kept frame being formatted
+        with ``template``. They are computed in parallel when
+        :meth:`to_group` was given ``workers``, and returned in order.
+        """
+        settings = (
+            self._number_format,
+            self._key_times_str,
+            self._max_error,
+            self._spline
+        )
+        return map_tracks(
+            _animation_values,
+            [(track, (template,) + settings) for track, template in tracks],
+            self._workers
+        )
+
     def to_group(
             self,
             dwg: svgwrite.Drawing,
-            frame_skip:int = 1
+            frame_skip:int = 1,
+            max_error: Optional[float] = None,
+            spline: bool = False,
+            number_format: Optional[NumberFormat] = None,
+            workers: Optional[int] = None
     ) -> svgwrite.Drawing:
+        """
+        With ``max_error`` the keyframes of every animated element are
+        decimated independently, dropping the ones that interpolation
+        reproduces within ``max_error`` pixels. ``spline`` interpolates the
+        kept keyframes with fitted ``keySplines`` instead of linearly, for
+        the elements where that makes the markup smaller.\n
 
-        if not self._frames:
-            raise RuntimeError("There is no frames to save")
+        ``number_format`` formats the coordinates, by default with the
+        precision of the drawer.\n
+
+        With ``workers`` the values of the animations are built by a pool of
+        that many processes.
+        """
 
-        self._n_frames = len(self._frames)
-        self._duration = self._n_frames / self._fps
+        if not self._recorded:
+            raise RuntimeError("There is no frames to save")
 
-        self._frames_to_use = self._frames[::frame_skip] if frame_skip > 1 \
-            else self._frames
+        self._duration = self._recorded / self._fps
+        self._frame_skip = max(1, frame_skip)
+        self._n_frames = len(range(0, self._recorded, self._frame_skip))
+        self._max_error = max_error
+        self._spline = spline
+        self._workers = workers
+        self._number_format = number_format \
+            if number_format is not None else NumberFormat(self._precision)
 
         if self._n_frames == 1:
             key_times = ["0", "1"]
         else:
             key_times = [
-                f"{i / (len(self._frames_to_use) - 1):.6f}"
-                for i in range(len(self._frames_to_use))
+                f"{i / (self._n_frames - 1):.6f}"
+                for i in range(self._n_frames)
             ]
         self._key_times_str = ";".join(key_times)
         group = dwg.g(id=f"{self._draw_group_name}-{self._id}")
-        self._n_frames = len(self._frames_to_use)
+        if self._number_format.transform is not None:
+            group["transform"] = self._number_format.transform
         return group
+
+
+def _animation_values(
+        track: np.ndarray,
+        template: str,
+        number_format: NumberFormat,
+        key_times: str,
+        max_error: Optional[float],
+        spline: bool
+) -> Tuple[List[str], Dict[str, str]]:
+    indices, timing = select_keyframes(track, key_times, max_error, spline)
+    frames = number_format.format_rows(track[indices])
+    return [template.format(*frame) for frame in frames], timing
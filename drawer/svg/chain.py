@@ -1,10 +1,11 @@
-from typing import Union, List
+from typing import Dict, List, Optional, Union
 
+import numpy as np
 import svgwrite
-from svgwrite import animate
 
 from .base_drawer import BaseDrawer
-from physics import Chain as BaseChain, Vector
+from .number_format import NumberFormat
+from physics import ArrayChain as BaseChain, Vector
 
 
 class Chain(BaseChain, BaseDrawer):
@@ -23,22 +24,28 @@ class Chain(BaseChain, BaseDrawer):
         self._bg_color = "#1e1e1e"
         self._stroke_width = 6
         self._joint_radius = 8
+        self._precision = 3
 
-    def record_frame(self) -> None:
-        self._frames.append([(p.x, p.y) for p in self.joints])
+    def capture_frame(self) -> Dict[str, np.ndarray]:
+        return {"joints": self.joints.copy()}
 
     def to_group(
             self,
             dwg: svgwrite.Drawing,
-            frame_skip:int = 1
+            frame_skip:int = 1,
+            max_error: Optional[float] = None,
+            spline: bool = False,
+            number_format: Optional[NumberFormat] = None
     ) -> svgwrite.Drawing:
-        chain_group = super().to_group(dwg, frame_skip)
+        chain_group = super().to_group(
+            dwg, frame_skip, max_error, spline, number_format)
+        scale = self._number_format.scale
 
         g_links = chain_group.add(dwg.g(
             id="links",
             stroke=self._line_color,
             fill="none",
-            stroke_width=self._stroke_width,
+            stroke_width=self._stroke_width * scale,
             stroke_linecap="round"
         ))
         g_joints = chain_group.add(dwg.g(
@@ -47,49 +54,20 @@ class Chain(BaseChain, BaseDrawer):
             stroke="none"
         ))
 
-        joint_cx_lists = []
-        joint_cy_lists = []
-        for j in range(len(self.joints)):
-            cx_vals = [
-                f"{self._frames_to_use[f][j][0]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            cy_vals = [
-                f"{self._frames_to_use[f][j][1]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            if self._n_frames == 1:
-                cx_vals *= 2
-                cy_vals *= 2
-            joint_cx_lists.append(cx_vals)
-            joint_cy_lists.append(cy_vals)
-
-        link_vals = []
-        for i in range(len(self.joints) - 1):
-            x1 = [
-                f"{self._frames_to_use[f][i][0]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            y1 = [
-                f"{self._frames_to_use[f][i][1]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            x2 = [
-                f"{self._frames_to_use[f][i + 1][0]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            y2 = [
-                f"{self._frames_to_use[f][i + 1][1]:.3f}"
-                for f in range(self._n_frames)
-            ]
-            if self._n_frames == 1:
-                x1 *= 2
-                y1 *= 2
-                x2 *= 2
-                y2 *= 2
-            link_vals.append((x1, y1, x2, y2))
+        joints = self._track("joints")
+        joint_cx_lists = [
+            self._number_format.format(joints[:, j, 0])
+            for j in range(joints.shape[1])
+        ]
+        joint_cy_lists = [
+            self._number_format.format(joints[:, j, 1])
+            for j in range(joints.shape[1])
+        ]
 
-        for (x1_list, y1_list, x2_list, y2_list) in link_vals:
+        for i in range(joints.shape[1] - 1):
+            indices, timing = self._keyframes(joints[:, i:i + 2])
+            x1_list, y1_list = joint_cx_lists[i], joint_cy_lists[i]
+            x2_list, y2_list = joint_cx_lists[i + 1], joint_cy_lists[i + 1]
             line = dwg.line(
                 start=(float(x1_list[0]), float(y1_list[0])),
                 end=(float(x2_list[0]), float(y2_list[0])),
@@ -98,29 +76,30 @@ class Chain(BaseChain, BaseDrawer):
                     ("x1", "y1", "x2", "y2"),
                     (x1_list, y1_list, x2_list, y2_list)
             ):
-                line.add(animate.Animate(
+                line.add(dwg.animate(
                     attr,
                     dur=f"{self._duration:.4f}s",
-                    values=";".join(vals),
-                    keyTimes=self._key_times_str,
-                    repeatCount="indefinite"
+                    values=[vals[k] for k in indices],
+                    repeatCount="indefinite",
+                    **timing
                 ))
             g_links.add(line)
 
         for j in range(len(self.joints)):
+            indices, timing = self._keyframes(joints[:, j:j + 1])
             cx0 = float(joint_cx_lists[j][0])
             cy0 = float(joint_cy_lists[j][0])
-            circ = dwg.circle(center=(cx0, cy0), r=self._joint_radius)
+            circ = dwg.circle(center=(cx0, cy0), r=self._joint_radius * scale)
             for attr, vals in zip(
                     ("cx", "cy"),
                     (joint_cx_lists[j], joint_cy_lists[j])
             ):
-                circ.add(animate.Animate(
+                circ.add(dwg.animate(
                     attr,
                     dur=f"{self._duration:.4f}s",
-                    values=";".join(vals),
-                    keyTimes=self._key_times_str,
-                    repeatCount="indefinite"
+                    values=[vals[k] for k in indices],
+                    repeatCount="indefinite",
+                    **timing
                 ))
             g_joints.add(circ)
 
@@ -1,11 +1,26 @@
-import copy
-from typing import Optional, Tuple
+import json
+import os
+from collections import deque
+from typing import Any, List, Optional
 
 import svgwrite
 
-from drawer.svg import ContributionMap, Lizard
-from github_user_contrib import GithubFetcher, DailyContribution
-from physics import Vector
+from drawer.route_planner import RoutePlanner
+from drawer.svg import (
+    ContributionMap,
+    Lizard,
+    RenderOptions,
+    StreamDrawing
+)
+from drawer.svg.stream_writer import open_output
+from drawer.target_index import TargetIndex
+from github_user_contrib import (
+    ContributionCache,
+    DailyContribution,
+    GithubFetcher
+)
+from github_user_contrib.daily_contribution import Quartile
+from physics import SimulationClock, Vector
 
 
 class ContributionGameSVG:
@@ -14,6 +29,10 @@ class ContributionGameSVG:
         "light": "#40939d",
         "default": "#03ac13",
     }
+    _writers = {
+        "svgwrite": svgwrite.Drawing,
+        "stream": StreamDrawing,
+    }
 
     def __init__(
             self,
@@ -21,10 +40,31 @@ class ContributionGameSVG:
             token: str,
             theme: str = "light",
             lizard_color: Optional[str] = None,
+            tick_rate: float = 30,
+            keyframe_rate: float = 10,
+            substeps: int = 1,
+            plan_route: bool = False,
+            respect_tiers: bool = True,
+            route_time_budget: float = 0.5,
+            frame_store: Optional[str] = None,
+            body_mode: str = "quads",
+            limb_mode: str = "path",
+            render_options: Optional[RenderOptions] = None,
+            cache: Optional[ContributionCache] = None,
+            days: Optional[List[DailyContribution]] = None,
     ) -> None:
-        self._map = ContributionMap(
-            GithubFetcher(user_name, token).get_daily_contributions(), theme
-        )
+        """
+        The contributions of ``user_name`` are fetched unless ``days`` are
+        given. :meth:`simulate` then records a theme independent trace of
+        the game, that :meth:`render` draws with the colors of any theme,
+        ``theme``, ``lizard_color`` and ``render_options`` being the
+        default ones. With ``cache`` the contributions are fetched through
+        it.
+        """
+        if days is None:
+            days = self.fetch(user_name, token, cache)
+        self._days = days
+        self._map = ContributionMap(days, theme)
         self._height = self._map.height
         self._width = self._map.width
         self._lizard = Lizard(
@@ -32,71 +72,147 @@ class ContributionGameSVG:
             0.25,
             color=self.get_lizard_color(theme)
             if lizard_color is None else lizard_color,
+            body_mode=body_mode,
+            limb_mode=limb_mode,
         )
+        self._theme = theme
+        self._custom_lizard_color = lizard_color
+        self._render_options = render_options or RenderOptions()
+        self._simulated = False
         self._current_day = None
         self._running = True
-        self._fps = 30
-        self._targets = copy.deepcopy(self._map.targets)
-        self._lizard.start_recording(fps=self._fps)
-        self._tpf = 1.0 / self._fps  # time per frame
-        self._speed = 12
+        self._clock = SimulationClock(tick_rate, keyframe_rate, substeps)
+        self._frame_store = frame_store
+        self._targets = TargetIndex(self._map.targets)
+        self._route = None
+        if plan_route:
+            self._route = deque(RoutePlanner(
+                self._map, respect_tiers, route_time_budget
+            ).plan(self._map.targets, self._lizard.spine.joint(0)))
+        self._lizard.start_recording(fps=self._clock.keyframe_rate)
+        self._speed = 360  # px per second
         self._current_target = None
 
+    @classmethod
+    def from_simulation(
+            cls,
+            directory: str,
+            **options: Any
+    ) -> 'ContributionGameSVG':
+        """
+        Game rendering the simulation saved in ``directory`` by
+        :meth:`save_simulation`, with the contributions it was played on.
+        ``options`` are the other arguments of the constructor.
+        """
+        with open(os.path.join(directory, "game.json")) as f:
+            saved = json.load(f)
+        days = [
+            DailyContribution(_date, contributions, week, day, quartile)
+            for _date, contributions, week, day, quartile in saved["days"]
+        ]
+        game = cls("", "", days=days, **options)
+        game.load_simulation(directory)
+        return game
+
+    def save_simulation(self, directory: str) -> None:
+        """
+        Persists the simulated game to ``directory``: the frames of the
+        lizard, the eating timeline of the map and the contributions, so
+        that it can be rendered again, for instance with other themes,
+        without simulating
+        """
+        if not self._simulated:
+            raise RuntimeError("The game has to be simulated first")
+        lizard_frames = self._lizard.save_frames(directory)
+        levels = {value: name for name, value in Quartile.items()}
+        with open(os.path.join(directory, "game.json"), "w") as f:
+            json.dump({
+                "lizard": os.path.basename(lizard_frames),
+                "duration": self._lizard.duration,
+                "eaten": self._map.timeline(),
+                "days": [
+                    [
+                        day.date.isoformat(),
+                        day.contributions,
+                        day.week_number,
+                        day.day_number,
+                        levels[day.quartile]
+                    ]
+                    for day in self._days
+                ]
+            }, f)
+
+    def load_simulation(self, directory: str) -> None:
+        """
+        Replaces the simulation by the one saved in ``directory`` by
+        :meth:`save_simulation`, for the same contributions
+        """
+        with open(os.path.join(directory, "game.json")) as f:
+            saved = json.load(f)
+        self._lizard.load_frames(os.path.join(directory, saved["lizard"]))
+        if abs(self._lizard.duration - saved["duration"]) > 1e-9:
+            raise ValueError("The saved frames do not match the simulation")
+        self._map.load_timeline(
+            [(col, row, time) for col, row, time in saved["eaten"]])
+        self._simulated = True
+
+    @staticmethod
+    def fetch(
+            user_name: str,
+            token: str,
+            cache: Optional[ContributionCache] = None
+    ) -> List[DailyContribution]:
+        return GithubFetcher(
+            user_name, token, cache=cache).get_daily_contributions()
+
     def get_lizard_color(self, theme: str) -> str:
         return self._lizard_color.get(theme, self._lizard_color["default"])
 
-    def sort_contributions(self, target_cell: Tuple[int, int]) -> None:
-        tx, ty = target_cell
-        self._targets = sorted(self._targets, key=lambda item: (
-            -item.contributions,
-            (abs(item.week_number - tx) + abs(item.day_number - ty))
-        ))
-
     def get_next_contribution_day(self) -> DailyContribution:
-        cell = self._map.vector2cell(self._lizard.spine.joints[0].copy())
-        self.sort_contributions(cell)
-        return self._targets.pop(0)
+        if self._route is not None:
+            return self._route.popleft()
+        cell = self._map.vector2cell(self._lizard.spine.joint(0))
+        return self._targets.pop_nearest(cell)
 
     def has_enough_contributions(self) -> bool:
-        return len(self._targets) > 0
+        targets = self._targets if self._route is None else self._route
+        return len(targets) > 0
 
     def move_lizard_to_target(self, target_pos) -> bool:
-        dist = self._current_target.dist(target_pos)
-        if dist > self._speed:
-            self._current_target = Vector.const_velocity(
-                self._current_target, target_pos, self._speed
-            )
-            self._lizard.resolve(self._current_target)
-            return False
-        else:
-            self._current_target = target_pos.copy()
-            self._lizard.resolve(self._current_target)
-            return True
+        step = self._speed * self._clock.dt / self._clock.substeps
+        for _ in range(self._clock.substeps):
+            dist = self._current_target.dist(target_pos)
+            if dist > step:
+                self._current_target = Vector.const_velocity(
+                    self._current_target, target_pos, step
+                )
+                self._lizard.resolve(self._current_target)
+            else:
+                self._current_target = target_pos.copy()
+                self._lizard.resolve(self._current_target)
+                return True
+        return False
 
-    def run(self) -> None:
-        t = 0
-        self._current_target = self._lizard.spine.joints[0].copy()
-        dwg = svgwrite.Drawing(
-            f"./dist/contribution_map_animation_{self._map.theme}.svg",
-            size=(self._map.width, self._map.height)
-        )
-        dwg.add(
-            dwg.rect(
-                insert=(0, 0),
-                size=(self._map.width, self._map.height),
-                fill="none"
-            )
+    def simulate(self) -> None:
+        """
+        Plays the game, recording the frames of the lizard and the time at
+        which each day is eaten
+        """
+        self._current_target = self._lizard.spine.joint(0)
+        self._lizard.start_recording(
+            fps=self._clock.keyframe_rate,
+            frame_store=self._frame_store
         )
-        self._lizard.start_recording(fps=self._fps)
+        interpolate = not self._clock.aligned
+        self._lizard.record_tick(self._clock.start(), interpolate)
         self._running = True
-        self._map.start_background(dwg)
         if self.has_enough_contributions():
             self._current_day = self.get_next_contribution_day()
-            self._map.remove_day(self._current_day, self._tpf)
+            self._map.remove_day(self._current_day, self._clock.dt)
         while self._running:
             if self.has_enough_contributions() and self._current_day is None:
                 self._current_day = self.get_next_contribution_day()
-                self._map.remove_day(self._current_day, t * self._tpf)
+                self._map.remove_day(self._current_day, self._clock.time)
             if self._current_day is not None:
                 bx = self._current_day.week_number
                 by = self._current_day.day_number
@@ -110,9 +226,92 @@ class ContributionGameSVG:
                     self._running = False
 
                 self._current_day = None
-            self._lizard.record_frame()
-            t += 1
+            self._lizard.record_tick(self._clock.tick(), interpolate)
+        self._simulated = True
+
+    def render(
+            self,
+            theme: Optional[str] = None,
+            lizard_color: Optional[str] = None,
+            options: Optional[RenderOptions] = None
+    ) -> str:
+        """
+        Draws the simulated game with the colors of ``theme`` and writes it
+        as set by ``options``, returning the path of the written file. Each
+        of them defaults to the one given to the constructor.\n
+
+        The ``"auto"`` theme writes a single file for both the light and
+        dark themes: every theme dependent color is a CSS custom property
+        switched by the color scheme preferred by the viewer, and the map
+        is drawn with the ``"css"`` backend.
+        """
+        if not self._simulated:
+            raise RuntimeError("The game has to be simulated first")
+        if theme is None:
+            theme = self._theme
+        if lizard_color is None:
+            lizard_color = self._custom_lizard_color
+        if options is None:
+            options = self._render_options
+        auto = theme == ContributionMap.AUTO_THEME
+        if lizard_color is None and auto:
+            # the group of the lizard gets its color from the style sheet
+            lizard_color = "currentColor"
+        self._lizard.color = self.get_lizard_color(theme) \
+            if lizard_color is None else lizard_color
+
+        os.makedirs(options.output_dir, exist_ok=True)
+        extension = "svg" if options.compress_level is None else "svgz"
+        name = "contribution_map_animation" if auto \
+            else f"contribution_map_animation_{theme}"
+        dwg = self._writers[options.writer](
+            os.path.join(options.output_dir, f"{name}.{extension}"),
+            size=(self._map.width, self._map.height)
+        )
+        dwg.add(
+            dwg.rect(
+                insert=(0, 0),
+                size=(self._map.width, self._map.height),
+                fill="none"
+            )
+        )
+        self._map.start_background(dwg, theme)
+        dwg.add(self._map.to_group(
+            dwg,
+            self._lizard.duration,
+            compact=options.keyframe_error is not None,
+            backend="css" if auto else options.map_backend,
+            bug_mode=options.bug_mode,
+            theme=theme
+        ))
+        lizard_group = self._lizard.to_group(
+            dwg,
+            max_error=options.keyframe_error,
+            spline=options.spline_keyframes,
+            number_format=options.number_format,
+            workers=options.workers
+        )
+        if lizard_color == "currentColor":
+            lizard_group["class"] = "cm-lizard"
+            dwg.defs.add(dwg.style(
+                ContributionMap.theme_rules({"cm-lizard": {
+                    theme: self.get_lizard_color(theme)
+                    for theme in ("light", "dark")
+                }})
+                + ".cm-lizard{color:var(--cm-lizard)}"
+            ))
+        dwg.add(lizard_group)
+        if options.writer == "stream":
+            dwg.save(
+                minify=options.minify,
+                compresslevel=options.compress_level
+            )
+        else:
+            with open_output(dwg.filename, options.compress_level) as f:
+                dwg.write(f)
+        return dwg.filename
 
-        dwg.add(self._map.to_group(dwg, t * self._tpf))
-        dwg.add(self._lizard.to_group(dwg, 3))
-        dwg.save()
+    def run(self) -> None:
+        if not self._simulated:
+            self.simulate()
+        self.render()
@@ -1,8 +1,7 @@
-from typing import List, Any
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import svgwrite
-from svgwrite import animate
 
 from drawer.base_contribution_map import BaseContributionMap
 from drawer.bug_shape import BUG_SHAPE
@@ -10,6 +9,14 @@ from github_user_contrib import DailyContribution
 
 
 class ContributionMap(BaseContributionMap):
+    _bug_path_cache: Dict[
+        Tuple[str, int], List[Tuple[Optional[str], str]]
+    ] = {}
+    _bug_colors = {
+        "light": "#000000",
+        "dark": "#ffffff",
+    }
+
     def __init__(
             self,
             days: List[DailyContribution],
@@ -18,26 +25,43 @@ class ContributionMap(BaseContributionMap):
         super().__init__(days, theme)
         self._cells_dict = {}
         self._cells_list = []
+        self._eat_times: Dict[Tuple[int, int], float] = {}
+
+    def start_background(
+            self,
+            dwg: svgwrite.Drawing,
+            theme: Optional[str] = None
+    ) -> None:
+        """
+        Creates the cells and the bug symbol of ``dwg`` with the colors of
+        ``theme``, :attr:`theme` by default. The eating timeline recorded by
+        :meth:`remove_day` is kept, so that the same timeline can be
+        rendered in several drawings.\n
 
-    def start_background(self, dwg: svgwrite.Drawing) -> None:
+        With the ``"auto"`` theme the cells are only drawn by the CSS
+        backend, no ``<rect>`` is created for the SMIL one.
+        """
+        theme = self.theme if theme is None else theme
         for day in self._days:
             col, row = day.week_number, day.day_number
             x, y = self.cell2xy(col=col, row=row)
-            rect = dwg.rect(
-                insert=(x, y),
-                size=(self._cell, self._cell),
-                fill=self.colors[self.theme][day.quartile],
-                id=f"cell-{col}-{row}",
-                opacity=1,
-                rx=4,
-                ry=4
-            )
+            rect = None
+            if theme != self.AUTO_THEME:
+                rect = dwg.rect(
+                    insert=(x, y),
+                    size=(self._cell, self._cell),
+                    fill=self.colors[theme][day.quartile],
+                    id=f"cell-{col}-{row}",
+                    opacity=1,
+                    rx=4,
+                    ry=4
+                )
             self._cells_dict[(col, row)] = {
                 "rect": rect,
                 "quartile": day.quartile,
-                "dur": 0
+                "dur": self._eat_times.get((col, row), 0)
             }
-        self.add_bug_symbol(dwg)
+        self.add_bug_symbol(dwg, theme=theme)
 
     def remove_day(
             self,
@@ -45,48 +69,272 @@ class ContributionMap(BaseContributionMap):
             elapsed_time: float
     ) -> None:
         col, row = target.week_number, target.day_number
-        self._cells_dict[(col, row)]["dur"] = elapsed_time
+        self._eat_times[(col, row)] = elapsed_time
+        if (col, row) in self._cells_dict:
+            self._cells_dict[(col, row)]["dur"] = elapsed_time
         self._cells_list.append((col, row))
 
+    def timeline(self) -> List[Tuple[int, int, float]]:
+        """
+        Cell and time of every day eaten so far, in eating order
+        """
+        return [
+            (col, row, self._eat_times[(col, row)])
+            for col, row in self._cells_list
+        ]
+
+    def load_timeline(self, eaten: List[Tuple[int, int, float]]) -> None:
+        """
+        Replaces the eating timeline with one returned by :meth:`timeline`
+        """
+        self._eat_times = {}
+        self._cells_list = []
+        for data in self._cells_dict.values():
+            data["dur"] = 0
+        for col, row, elapsed_time in eaten:
+            self._eat_times[(col, row)] = elapsed_time
+            if (col, row) in self._cells_dict:
+                self._cells_dict[(col, row)]["dur"] = elapsed_time
+            self._cells_list.append((col, row))
+
     def to_group(
             self,
             dwg: svgwrite.Drawing,
-            total_elapsed_time: float
+            total_elapsed_time: float,
+            compact: bool = False,
+            backend: str = "smil",
+            bug_mode: str = "cells",
+            theme: Optional[str] = None
     ) -> svgwrite.Drawing:
+        """
+        Animated cells and bugs with the colors of ``theme``, :attr:`theme`
+        by default, which must be the one :meth:`start_background` was
+        given.\n
+
+        With ``compact`` the cells and bugs are animated with the minimal
+        discrete keyframes of their single state change instead of
+        duplicated linear ones.\n
+
+        The ``"css"`` backend animates them with shared CSS keyframes
+        instead of an ``<animate>`` per element, see :meth:`_css_group`.\n
+
+        The ``"sprite"`` bug mode draws a single bug jumping from cell to
+        cell, see :meth:`place_bug_sprite`, instead of a bug per cell.\n
+
+        The ``"auto"`` theme, whose colors follow the color scheme of the
+        viewer, requires the ``"css"`` backend.
+        """
+        if bug_mode not in ("cells", "sprite"):
+            raise ValueError(f"Unknown bug mode {bug_mode!r}")
+        theme = self.theme if theme is None else theme
+        if backend == "css":
+            return self._css_group(dwg, total_elapsed_time, bug_mode, theme)
+        if backend != "smil":
+            raise ValueError(f"Unknown animation backend {backend!r}")
+        if theme == self.AUTO_THEME:
+            raise ValueError("The auto theme requires the css backend")
+
         g_map = dwg.g(id="contribution-map")
         for (col, row), data in self._cells_dict.items():
             cell_group = dwg.g(id=f"cell-{col}-{row}")
             if data['dur'] > 0:
-                color1 = self.colors[self.theme][data.get('quartile')]
-                color2 = self.colors[self.theme][0]
+                color1 = self.colors[theme][data.get('quartile')]
+                color2 = self.colors[theme][0]
                 transition = data['dur'] / total_elapsed_time
-                anim = animate.Animate(
+                if compact:
+                    timing = {
+                        "values": f"{color1};{color2}",
+                        "keyTimes": f"0;{transition}",
+                        "calcMode": "discrete"
+                    }
+                else:
+                    timing = {
+                        "values": f"{color1};{color1};{color2};{color2}",
+                        "keyTimes": f"0;{transition};{transition};1"
+                    }
+                anim = dwg.animate(
                     attributeName="fill",
-                    values=f"{color1};{color1};{color2};{color2}",
-                    keyTimes=f"0;{transition};{transition};1",
                     begin="0s",
                     dur=f"{total_elapsed_time:.3f}s",
                     fill="freeze",
-                    repeatCount="indefinite"
+                    repeatCount="indefinite",
+                    **timing
                 )
                 data["rect"].add(anim)
             cell_group.add(data.get("rect"))
             g_map.add(cell_group)
 
+        if bug_mode == "sprite":
+            self.place_bug_sprite(dwg, g_map, total_elapsed_time)
+            return g_map
+        for col, row, start_time, hide_time in self._bug_windows():
+            self.place_bug(
+                dwg=dwg,
+                group=g_map,
+                col=col,
+                row=row,
+                start_time=start_time,
+                hide_time=hide_time,
+                total_duration=total_elapsed_time,
+                compact=compact
+            )
+        return g_map
+
+    def _bug_windows(self) -> List[Tuple[int, int, float, float]]:
+        """
+        Cell, appearance and disappearance time of every bug: a bug shows
+        up when its cell is targeted and is eaten when the next cell is
+        """
+        windows = []
         for i, (col, row) in enumerate(self._cells_list):
             data = self._cells_dict[(col, row)]
             if data.get('quartile') > 0:
-                self.place_bug(
-                    dwg=dwg,
-                    group=g_map,
-                    col=col,
-                    row=row,
-                    start_time=data["dur"],
-                    hide_time=self._cells_dict[self._cells_list[i + 1]]["dur"]
+                windows.append((
+                    col,
+                    row,
+                    data["dur"],
+                    self._cells_dict[self._cells_list[i + 1]]["dur"]
                     if i < len(self._cells_list) - 1
-                    else data["dur"] + 0.25,
-                    total_duration=total_elapsed_time,
+                    else data["dur"] + 0.25
+                ))
+        return windows
+
+    def _css_rules(self, period: float, theme: str) -> str:
+        """
+        Style sheet shared by the cells and bugs of the CSS backend: a class
+        per quartile color and two animations that show an element during
+        the first half of the period, one through ``opacity`` and the other
+        through ``fill-opacity``.\n
+
+        With the ``"auto"`` theme the colors are the custom properties of
+        :meth:`theme_rules`, and the bug is colored through ``cm-bug``.
+        """
+        if theme == self.AUTO_THEME:
+            rules = [
+                f".cm-q{quartile}{{fill:var(--cm-q{quartile})}}"
+                for quartile in self.colors["light"]
+            ]
+            rules.append(".cm-bug{fill:var(--cm-bug)}")
+            variables = {
+                f"cm-q{quartile}": {
+                    theme: colors[quartile]
+                    for theme, colors in self.colors.items()
+                }
+                for quartile in self.colors["light"]
+            }
+            variables["cm-bug"] = self._bug_colors
+            rules.insert(0, self.theme_rules(variables))
+        else:
+            rules = [
+                f".cm-q{quartile}{{fill:{color}}}"
+                for quartile, color in self.colors[theme].items()
+            ]
+        rules += [
+            "@keyframes cm-o{0%{opacity:1}50%,100%{opacity:0}}",
+            "@keyframes cm-f{0%{fill-opacity:1}50%,100%{fill-opacity:0}}",
+            f".cm-e{{animation:cm-o {period:.3f}s step-end infinite,"
+            f"cm-f {period:.3f}s step-end infinite}}",
+        ]
+        return "".join(rules)
+
+    @staticmethod
+    def theme_rules(variables: Dict[str, Dict[str, str]]) -> str:
+        """
+        Rules defining the CSS custom properties ``--name`` of
+        ``variables``, mapping each name to its value per theme: the light
+        value by default and the dark one when the viewer prefers a dark
+        color scheme
+        """
+        def declarations(theme: str) -> str:
+            return ";".join(
+                f"--{name}:{values[theme]}"
+                for name, values in variables.items()
+            )
+        return (
+            f":root{{{declarations('light')}}}"
+            "@media (prefers-color-scheme:dark)"
+            f"{{:root{{{declarations('dark')}}}}}"
+        )
+
+    @staticmethod
+    def _css_window(start: float, end: float, period: float) -> str:
+        """
+        ``animation-delay`` of an element of class ``cm-e`` that shows it
+        from ``start`` to ``end`` of every period, which must not be longer
+        than half the period. Both animations show it for half a period,
+        the first one from ``start`` and the second one until ``end``, so
+        that it is visible only in the intersection.
+        """
+        # negative delays start the animations mid period, adding 0.0
+        # turns -0.0 into 0.0
+        delays = (
+            0.0 - (period - start) % period,
+            0.0 - (period - end + period / 2) % period
+        )
+        return "animation-delay:{:.3f}s,{:.3f}s".format(*delays)
+
+    def _css_group(
+            self,
+            dwg: svgwrite.Drawing,
+            period: float,
+            bug_mode: str = "cells",
+            theme: Optional[str] = None
+    ) -> svgwrite.Drawing:
+        """
+        Cells and bugs animated by the rules of :meth:`_css_rules`, that
+        can only show an element for at most half a period. An eaten cell is
+        drawn as a static rect under a rect showing the color of the shorter
+        of its two states, and a bug visible for more than half a period is
+        drawn twice, each for half of its time.
+        """
+        theme = self.theme if theme is None else theme
+        dwg.defs.add(dwg.style(self._css_rules(period, theme)))
+        half = period / 2
+        g_map = dwg.g(id="contribution-map")
+        for (col, row), data in self._cells_dict.items():
+            cell_group = dwg.g(id=f"cell-{col}-{row}")
+            x, y = self.cell2xy(col=col, row=row)
+            transition = data["dur"]
+            layers = [(data["quartile"], None)]
+            if transition > 0 and transition <= half:
+                layers = [
+                    (0, None),
+                    (data["quartile"], (0, transition))
+                ]
+            elif transition > half:
+                layers.append((0, (transition, period)))
+            for quartile, window in layers:
+                rect = dwg.rect(
+                    insert=(x, y),
+                    size=(self._cell, self._cell),
+                    class_=f"cm-q{quartile}",
+                    rx=4,
+                    ry=4
                 )
+                if window is not None:
+                    rect["class"] += " cm-e"
+                    rect["style"] = self._css_window(*window, period)
+                cell_group.add(rect)
+            g_map.add(cell_group)
+
+        if bug_mode == "sprite":
+            self.place_bug_sprite(dwg, g_map, period)
+            return g_map
+        for col, row, start_time, hide_time in self._bug_windows():
+            x, y = self.cell2xy(col, row)
+            if hide_time - start_time > half:
+                middle = (start_time + hide_time) / 2
+                windows = [(start_time, middle), (middle, hide_time)]
+            else:
+                windows = [(start_time, hide_time)]
+            for window in windows:
+                g_map.add(dwg.use(
+                    "#bug",
+                    insert=(x, y),
+                    size=(self._cell, self._cell),
+                    class_="cm-e",
+                    style=self._css_window(*window, period)
+                ))
         return g_map
 
     def place_bug(
@@ -98,6 +346,7 @@ class ContributionMap(BaseContributionMap):
             start_time: float,
             hide_time: float,
             total_duration: float,
+            compact: bool = False
     ) -> None:
         x, y = self.cell2xy(col, row)
         use = dwg.use("#bug", insert=(x, y), size=(self._cell, self._cell))
@@ -105,9 +354,14 @@ class ContributionMap(BaseContributionMap):
         t1 = start_time / total_duration
         t2 = hide_time / total_duration
         t3 = 1.0
-        values = "0;1;0;0"
-        key_times_str = f"{t0:.3f};{t1:.3f};{t2:.3f};{t3:.3f}"
-        use.add(animate.Animate(
+        if compact:
+            # a discrete animation holds its last value until the end
+            values = "0;1;0"
+            key_times_str = f"{t0:.3f};{t1:.3f};{t2:.3f}"
+        else:
+            values = "0;1;0;0"
+            key_times_str = f"{t0:.3f};{t1:.3f};{t2:.3f};{t3:.3f}"
+        use.add(dwg.animate(
             attributeName="opacity",
             dur=f"{total_duration:.3f}s",
             values=values,
@@ -118,18 +372,103 @@ class ContributionMap(BaseContributionMap):
         ))
         group.add(use)
 
-    def add_bug_symbol(self, dwg, symbol_id="bug") -> None:
+    def place_bug_sprite(
+            self,
+            dwg: svgwrite.Drawing,
+            group: Any,
+            total_duration: float
+    ) -> None:
+        """
+        Adds to ``group`` a single bug whose position and opacity are
+        animated discretely along the eating timeline, so that it shows up
+        in each targeted cell until the next one is targeted
+        """
+        windows = self._bug_windows()
+        if not windows:
+            return
+        # (time, opacity, cell) of every change of the bug
+        events = [(0.0, 0, windows[0][:2])]
+        for col, row, start_time, hide_time in windows:
+            while events and events[-1][0] >= start_time:
+                events.pop()
+            events.append((start_time, 1, (col, row)))
+            events.append((hide_time, 0, (col, row)))
+        events = [event for event in events if event[0] < total_duration]
+
+        positions = [self.cell2xy(col, row) for _, _, (col, row) in events]
+        timing = {
+            "dur": f"{total_duration:.3f}s",
+            "keyTimes": ";".join(
+                f"{t / total_duration:.6f}" for t, _, _ in events),
+            "fill": "freeze",
+            "repeatCount": "indefinite",
+            "calcMode": "discrete"
+        }
+        use = dwg.use(
+            "#bug",
+            insert=positions[0],
+            size=(self._cell, self._cell),
+            opacity=events[0][1]
+        )
+        for attribute, values in (
+                ("x", [x for x, _ in positions]),
+                ("y", [y for _, y in positions]),
+                ("opacity", [opacity for _, opacity, _ in events])
+        ):
+            use.add(dwg.animate(
+                attributeName=attribute, values=values, **timing))
+        group.add(use)
+
+    def add_bug_symbol(self, dwg, symbol_id="bug", theme=None) -> None:
         symbol = dwg.symbol(id=symbol_id)
-        scale = self._cell / BUG_SHAPE.shape[0]
-        for i in range(BUG_SHAPE.shape[0]):
-            for j in range(BUG_SHAPE.shape[1]):
-                if np.isnan(BUG_SHAPE[i, j]):
-                    continue
-                v = "#000000" if self.theme == "light" else "#ffffff"
-                color = v if BUG_SHAPE[i, j] == 1 else "#c80000"
-                symbol.add(dwg.rect(
-                    insert=(j * scale, i * scale),
-                    size=(scale, scale),
-                    fill=color
-                ))
+        for color, d in self._bug_paths(
+                self.theme if theme is None else theme):
+            if color is None:
+                symbol.add(dwg.path(d=d, class_="cm-bug"))
+            else:
+                symbol.add(dwg.path(d=d, fill=color))
         dwg.defs.add(symbol)
+
+    def _bug_paths(self, theme: str) -> List[Tuple[Optional[str], str]]:
+        """
+        Color and path data of each color of the bug with ``theme``, cached
+        per theme and cell size. The theme dependent color is ``None`` with
+        the ``"auto"`` theme, being set by the style sheet instead.
+        """
+        key = (theme, self._cell)
+        if key not in self._bug_path_cache:
+            v = None if theme == self.AUTO_THEME \
+                else self._bug_colors.get(theme, "#ffffff")
+            scale = self._cell / BUG_SHAPE.shape[0]
+            self._bug_path_cache[key] = [
+                (
+                    v if value == 1 else "#c80000",
+                    "".join(
+                        f"M{x * scale:g},{y * scale:g}h{w * scale:g}"
+                        f"v{h * scale:g}h{-w * scale:g}z"
+                        for x, y, w, h in _merge_runs(BUG_SHAPE == value)
+                    )
+                )
+                for value in np.unique(BUG_SHAPE[~np.isnan(BUG_SHAPE)])
+            ]
+        return self._bug_path_cache[key]
+
+
+def _merge_runs(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Rectangles ``(x, y, width, height)`` covering ``mask``: horizontal runs
+    of each row, merged with the identical runs of the following rows
+    """
+    edges = np.diff(np.pad(mask, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    rects = []
+    open_rects = {}
+    for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+        rect = open_rects.get((start, end))
+        if rect is not None and rect[1] + rect[3] == row:
+            rect[3] += 1
+        else:
+            rect = open_rects[(start, end)] = [start, row, end - start, 1]
+            rects.append(rect)
+    return [tuple(rect) for rect in rects]
@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+
+
+class FrameBuffer:
+    """
+    Growable array of recorded frames of shape ``(frames, points, 2)``. The
+    storage is preallocated and doubled when full, so appending a frame is
+    amortized constant time and only copies the new points.
+    """
+
+    def __init__(self, points: int, capacity: int = 256) -> None:
+        self._data = np.empty((max(1, capacity), points, 2), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def points(self) -> int:
+        return self._data.shape[1]
+
+    @property
+    def frames(self) -> np.ndarray:
+        """
+        View of the recorded frames, of shape ``(len(self), points, 2)``
+        """
+        return self._data[:self._size]
+
+    def append(self, frame: np.ndarray) -> None:
+        if self._size == self._data.shape[0]:
+            data = np.empty(
+                (2 * self._size,) + self._data.shape[1:], dtype=np.float64)
+            data[:self._size] = self._data
+            self._data = data
+        self._data[self._size] = frame
+        self._size += 1
+
+    def save(self, path: str) -> None:
+        """
+        Writes the recorded frames to ``path`` as raw float64 values, the
+        format read back by :class:`MemmapFrameBuffer`
+        """
+        self.frames.tofile(path)
+
+
+class MemmapFrameBuffer:
+    """
+    :class:`FrameBuffer` backed by a file of raw float64 values. Appended
+    frames are streamed to the file and read back through a read only
+    ``numpy.memmap``, so the memory used by the recording does not grow with
+    the length of the animation.
+    """
+
+    def __init__(self, path: str, points: int, frames: int) -> None:
+        """
+        Parameters
+        ----------
+        path: `str`
+            File holding the frames
+        points: `int`
+            Number of points per frame
+        frames: `int`
+            Number of frames already stored in ``path``
+        """
+        self._path = path
+        self._points = points
+        self._size = frames
+        self._file = None
+
+    @classmethod
+    def create(cls, path: str, points: int) -> 'MemmapFrameBuffer':
+        open(path, "wb").close()
+        return cls(path, points, 0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def points(self) -> int:
+        return self._points
+
+    @property
+    def frames(self) -> np.ndarray:
+        """
+        Read only memory mapped view of the recorded frames, of shape
+        ``(len(self), points, 2)``
+        """
+        if self._file is not None:
+            self._file.flush()
+        if not self._size:
+            return np.empty((0, self._points, 2), dtype=np.float64)
+        return np.memmap(
+            self._path,
+            dtype=np.float64,
+            mode="r",
+            shape=(self._size, self._points, 2)
+        )
+
+    def append(self, frame: np.ndarray) -> None:
+        if self._file is None:
+            self._file = open(self._path, "ab")
+        self._file.write(np.ascontiguousarray(frame, dtype=np.float64).data)
+        self._size += 1
+
+    def save(self, path: str) -> None:
+        if os.path.exists(path) and os.path.samefile(path, self._path):
+            if self._file is not None:
+                self._file.flush()
+            return
+        self.frames.tofile(path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
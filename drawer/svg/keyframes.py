@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def decimate(
+        track: np.ndarray,
+        max_error: float,
+        spline: bool = False
+) -> np.ndarray:
+    """
+    Ramer–Douglas–Peucker simplification over time of a track of shape
+    ``(frames, points, 2)``. Frames are dropped as long as interpolating the
+    kept ones, linearly or with the timing curve fitted by
+    :func:`fit_key_spline` when ``spline`` is set, keeps every point within
+    ``max_error`` pixels of its recorded position.\n
+
+    Returns the sorted indices of the kept frames, always including the first
+    and the last one.
+    """
+    n = len(track)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    segments = [(0, n - 1)]
+    while segments:
+        a, b = segments.pop()
+        if b - a < 2:
+            continue
+        error = _segment_error(track[a:b + 1], spline)
+        k = int(np.argmax(error))
+        if error[k] > max_error:
+            m = a + 1 + k
+            keep[m] = True
+            segments.append((a, m))
+            segments.append((m, b))
+    return np.flatnonzero(keep)
+
+
+def select_keyframes(
+        track: np.ndarray,
+        key_times: str,
+        max_error: Optional[float] = None,
+        spline: bool = False
+) -> Tuple[List[int], Dict[str, str]]:
+    """
+    Frames of ``track``, of shape ``(frames, points, 2)``, that an element
+    animated along it has to emit, and the timing attributes of its
+    animation. ``key_times`` are the evenly spaced times of every frame.
+    Every frame is kept unless ``max_error`` is given, see :func:`decimate`.
+    """
+    n_frames = len(track)
+    if n_frames == 1:
+        return [0, 0], {"keyTimes": key_times}
+    if max_error is None:
+        return list(range(n_frames)), {"keyTimes": key_times}
+
+    indices = decimate(track, max_error)
+    splines = None
+    if spline:
+        spline_indices = decimate(track, max_error, spline=True)
+        # rough markup size, a coordinate takes about 8 characters and
+        # a keySplines entry about 24
+        frame_size = 9 + 16 * track.shape[1]
+        if len(spline_indices) * frame_size \
+                + (len(spline_indices) - 1) * 24 \
+                < len(indices) * frame_size:
+            indices = spline_indices
+            splines = key_splines(track, indices)
+
+    timing = {
+        "keyTimes": ";".join(
+            f"{i / (n_frames - 1):.6f}" for i in indices.tolist()
+        )
+    }
+    if splines is not None:
+        timing["calcMode"] = "spline"
+        timing["keySplines"] = ";".join(splines)
+    return indices.tolist(), timing
+
+
+def key_splines(track: np.ndarray, indices: np.ndarray) -> List[str]:
+    """
+    ``keySplines`` entries of every interval between the kept ``indices``
+    of ``track``
+    """
+    splines = []
+    for a, b in zip(indices[:-1].tolist(), indices[1:].tolist()):
+        y1, y2 = fit_key_spline(track[a:b + 1])
+        splines.append(f"0.333 {y1:.3f} 0.667 {y2:.3f}")
+    return splines
+
+
+def fit_key_spline(segment: np.ndarray) -> Tuple[float, float]:
+    """
+    Least squares fit of the timing curve of the frames of ``segment``
+    between its first and last frame. The curve is the cubic Bézier
+    ``(0, 0), (1/3, y1), (2/3, y2), (1, 1)``, whose x coordinate equals its
+    parameter, so that ``(y1, y2)`` are the only unknowns. Returns the
+    linear timing ``(1/3, 2/3)`` when there is nothing to fit.
+    """
+    if len(segment) <= 2:
+        return 1 / 3, 2 / 3
+    u = np.linspace(0, 1, len(segment))[1:-1]
+    delta = segment[-1] - segment[0]
+    norm = float((delta ** 2).sum())
+    if norm < 1e-12:
+        return 1 / 3, 2 / 3
+    progress = ((segment[1:-1] - segment[0]) * delta).sum(axis=(1, 2)) / norm
+    basis = np.stack([3 * (1 - u) ** 2 * u, 3 * (1 - u) * u ** 2], axis=1)
+    # deviation from the linear timing, regularized for short segments
+    lhs = basis.T @ basis + 1e-6 * np.eye(2)
+    rhs = basis.T @ (progress - u)
+    dy1, dy2 = np.linalg.solve(lhs, rhs).tolist()
+    return (
+        min(1.0, max(0.0, 1 / 3 + dy1)),
+        min(1.0, max(0.0, 2 / 3 + dy2))
+    )
+
+
+def _spline_progress(y1: float, y2: float, u: np.ndarray) -> np.ndarray:
+    return 3 * (1 - u) ** 2 * u * y1 + 3 * (1 - u) * u ** 2 * y2 + u ** 3
+
+
+def _segment_error(segment: np.ndarray, spline: bool) -> np.ndarray:
+    """
+    Largest distance, per interior frame of ``segment``, between the
+    recorded points and the interpolation of the first and last frames
+    """
+    u = np.linspace(0, 1, len(segment))[1:-1]
+    if spline:
+        u = _spline_progress(*fit_key_spline(segment), u)
+    interpolated = segment[0] + (segment[-1] - segment[0]) * u[:, None, None]
+    offset = segment[1:-1] - interpolated
+    return np.hypot(offset[..., 0], offset[..., 1]).max(axis=1)
@@ -1,128 +1,311 @@
-import math
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import svgwrite
-from svgwrite import animate
 
 from creatures import Lizard as BaseLizard
 from .base_drawer import BaseDrawer
+from .number_format import NumberFormat
 from physics import Vector
 
 
 class Lizard(BaseLizard, BaseDrawer):
+    _body_modes = ("quads", "outline", "smooth")
+    _limb_modes = ("path", "transform")
+
     def __init__(
             self,
             origin: Vector,
             scale: float = 1.0,
-            color: str = "#03ac13"
+            color: str = "#03ac13",
+            body_mode: str = "quads",
+            limb_mode: str = "path"
     ) -> None:
+        """
+        Parameters
+        ----------
+        origin: `Vector`
+            Position of the head
+        scale: `float`
+            Size of the lizard
+        color: `str`
+            Color of the body
+        body_mode: `str`
+            ``"quads"`` draws a quad per spine segment, ``"outline"`` a single
+            closed outline of the body and ``"smooth"`` the same outline
+            smoothed with quadratic curves
+        limb_mode: `str`
+            ``"path"`` rewrites the path of the arms and of the head every
+            keyframe, ``"transform"`` draws every arm segment and the head
+            once and moves them with ``animateTransform``
+        """
+        if body_mode not in self._body_modes:
+            raise ValueError(f"Unknown body mode {body_mode!r}")
+        if limb_mode not in self._limb_modes:
+            raise ValueError(f"Unknown limb mode {limb_mode!r}")
         super().__init__(origin, scale)
         BaseDrawer.__init__(self)
         self._draw_group_name = "lizard"
         self._background_color = "#1e1e1e"
         self._body_color = color
+        self._half_width = np.array(self.body_width) / 2
+        self._body_mode = body_mode
+        self._limb_mode = limb_mode
+        self._angle_format = NumberFormat(1, strip_zeros=True)
+
+    @property
+    def color(self) -> str:
+        return self._body_color
+
+    @color.setter
+    def color(self, color: str) -> None:
+        self._body_color = color
+
+    def capture_frame(self) -> Dict[str, np.ndarray]:
+        return {
+            "spine": self.spine.joints.copy(),
+            "arms": self._arm_chains.joints.reshape(-1, 2).copy(),
+        }
+
+    @staticmethod
+    def _segment_normals(spine: np.ndarray) -> np.ndarray:
+        """
+        Unit normals of the spine segments of every frame, zero for the
+        segments of null length
+        """
+        delta = spine[:, 1:] - spine[:, :-1]
+        length = np.hypot(delta[..., 0], delta[..., 1])
+        length[length == 0] = np.inf
+        return np.stack([-delta[..., 1], delta[..., 0]], axis=-1) \
+            / length[..., None]
+
+    def _body_quads(self, spine: np.ndarray) -> np.ndarray:
+        """
+        Quads around every spine segment, an array of shape
+        ``(frames, joints - 1, 4, 2)`` computed from the ``spine`` track
+        """
+        radius = self._half_width
+        normal = self._segment_normals(spine)
+        j1, j2 = spine[:, :-1], spine[:, 1:]
+        n1 = normal * radius[:-1, None]
+        n2 = normal * radius[1:, None]
+        return np.stack([j1 + n1, j1 - n1, j2 - n2, j2 + n2], axis=2)
+
+    def _body_outline(self, spine: np.ndarray) -> np.ndarray:
+        """
+        Closed outline of the body, an array of shape
+        ``(frames, 2 * joints, 2)`` going down the left side of the spine
+        and back up its right side. Each joint is offset along the mitered
+        average of the normals of its segments, so that the body keeps its
+        width in bends.
+        """
+        normal = self._segment_normals(spine)
+        padding = np.zeros_like(normal[:, :1])
+        miter = np.concatenate([padding, normal], axis=1) \
+            + np.concatenate([normal, padding], axis=1)
+        # number of segments of non null length around each joint
+        count = (miter != 0).any(axis=-1) * 1.0
+        count[:, 1:-1] = normal[:, :-1].any(axis=-1) * 1.0 \
+            + normal[:, 1:].any(axis=-1)
+        # a joint between two segments is pushed by 1 / cos of half their
+        # angle, limited to twice the radius
+        norm = np.maximum((miter ** 2).sum(axis=-1), 0.25 * count ** 2)
+        norm[count == 0] = 1
+        offset = miter * (count / norm * self._half_width)[..., None]
+        return np.concatenate(
+            [spine + offset, (spine - offset)[:, ::-1]], axis=1)
+
+    @staticmethod
+    def _smooth_outline(outline: np.ndarray) -> np.ndarray:
+        """
+        Points of the closed quadratic curve through the middles of the
+        edges of ``outline``: the middle of the closing edge followed by
+        each vertex, used as control point, and the middle of its next
+        edge, an array of shape ``(frames, 2 * points + 1, 2)``
+        """
+        middle = (outline + np.roll(outline, -1, axis=1)) / 2
+        curve = np.stack([outline, middle], axis=2) \
+            .reshape(len(outline), -1, 2)
+        return np.concatenate([middle[:, -1:], curve], axis=1)
+
+    def _add_animated_paths(
+            self,
+            dwg: svgwrite.Drawing,
+            paths: List[Tuple[Any, np.ndarray, str]]
+    ) -> None:
+        """
+        Adds, for every ``(group, track, template)`` of ``paths``, a path to
+        ``group`` whose ``d`` follows ``track``, formatting the coordinates
+        of every kept frame with ``template``
+        """
+        animations = self._animation_values(
+            [(track, template) for _, track, template in paths])
+        for (group, _, _), (values, timing) in zip(paths, animations):
+            path = dwg.path(d=values[0])
+            path.add(dwg.animate(
+                "d",
+                dur=f"{self._duration:.2f}s",
+                values=values,
+                fill="freeze",
+                repeatCount="indefinite",
+                **timing
+            ))
+            group.add(path)
+
+    def _add_rigid_use(
+            self,
+            dwg: svgwrite.Drawing,
+            group: Any,
+            href: str,
+            position: np.ndarray,
+            angle: Optional[np.ndarray] = None,
+            length: float = 0.0
+    ) -> None:
+        """
+        Adds to ``group`` a use of ``href`` translated along ``position``, of
+        shape ``(frames, 2)``, and rotated by the unwrapped ``angle`` in
+        radians of each frame
+        """
+        track = position[:, None]
+        if angle is not None:
+            # the rotation is weighted by the length of the segment, so that
+            # decimation bounds the error at its end
+            end = np.stack([angle * length, np.zeros_like(angle)], axis=-1)
+            track = np.concatenate([track, end[:, None]], axis=1)
+        indices, timing = self._keyframes(track)
+        if timing["keyTimes"] == self._key_times_str:
+            # evenly spaced keyTimes are the default of linear animations
+            del timing["keyTimes"]
+
+        transforms = [("translate", [
+            f"{x},{y}"
+            for x, y in self._number_format.format_rows(position[indices])
+        ])]
+        if angle is not None:
+            transforms.append(("rotate", self._angle_format.format(
+                np.degrees(angle[indices]))))
 
-    def record_frame(self) -> None:
-        body_path = []
-        for i in range(len(self.spine.joints) - 1):
-            j1, j2 = self.spine.joints[i], self.spine.joints[i + 1]
-            r1, r2 = self.body_width[i] / 2, self.body_width[i + 1] / 2
-            dx, dy = j2.x - j1.x, j2.y - j1.y
-            l = math.hypot(dx, dy)
-            if l == 0:
-                continue
-            nx, ny = -dy / l, dx / l
-            body_path.append([(j1.x + nx * r1, j1.y + ny * r1),
-                              (j1.x - nx * r1, j1.y - ny * r1),
-                              (j2.x - nx * r2, j2.y - ny * r2),
-                              (j2.x + nx * r2, j2.y + ny * r2)])
-        arm_paths = []
-        for arm in self.arms:
-            points = [(j.x, j.y) for j in arm.joints]
-            arm_paths.append(points)
-        self._frames.append({
-            "body": body_path,
-            "arms": arm_paths,
-            "head": (self.spine.joints[0].x, self.spine.joints[0].y)
-        })
+        use = dwg.use(href)
+        use["transform"] = " ".join(
+            f"{transform}({values[0]})" for transform, values in transforms)
+        for transform, values in transforms:
+            anim = dwg.animateTransform(
+                transform,
+                dur=f"{self._duration:.2f}s",
+                values=values,
+                fill="freeze",
+                repeatCount="indefinite",
+                **timing
+            )
+            anim["attributeName"] = "transform"
+            if transform == "rotate":
+                anim["additive"] = "sum"
+            use.add(anim)
+        group.add(use)
+
+    def _add_rigid_limbs(
+            self,
+            dwg: svgwrite.Drawing,
+            g_arms: Any,
+            g_head: Any,
+            spine: np.ndarray,
+            arms: np.ndarray
+    ) -> None:
+        """
+        Draws every arm segment and the head once in the definitions of
+        ``dwg`` and moves them with transforms
+        """
+        prefix = f"{self._draw_group_name}-{self._id}"
+        number_format = self._number_format
+
+        head_id = f"{prefix}-head"
+        radius = number_format.format(self._half_width[:1])[0]
+        dwg.defs.add(dwg.circle(r=radius, stroke="none", id=head_id))
+        self._add_rigid_use(dwg, g_head, f"#{head_id}", spine[:, 0])
+
+        segment_ids = {}
+        for arm_idx, arm in enumerate(self.arms):
+            joints = arms[:, 3 * arm_idx:3 * arm_idx + 3]
+            delta = joints[:, 1:] - joints[:, :-1]
+            angles = np.unwrap(
+                np.arctan2(delta[..., 1], delta[..., 0]), axis=0)
+            for k, length in enumerate(arm._links):
+                (size,) = number_format.format([length])
+                if size not in segment_ids:
+                    segment_ids[size] = f"{prefix}-segment-{len(segment_ids)}"
+                    dwg.defs.add(dwg.path(
+                        d=f"M0,0 L{size},0", id=segment_ids[size]))
+                self._add_rigid_use(
+                    dwg, g_arms, f"#{segment_ids[size]}",
+                    joints[:, k], angles[:, k], length
+                )
 
     def to_group(
             self,
             dwg: svgwrite.Drawing,
-            frame_skip:int = 1
+            frame_skip:int = 1,
+            max_error: Optional[float] = None,
+            spline: bool = False,
+            number_format: Optional[NumberFormat] = None,
+            workers: Optional[int] = None
     ) -> svgwrite.Drawing:
-        lizard_group = super().to_group(dwg, frame_skip)
+        lizard_group = super().to_group(
+            dwg, frame_skip, max_error, spline, number_format, workers)
+        scale = self._number_format.scale
 
         g_body = lizard_group.add(dwg.g(
             fill=self._body_color,
             stroke=self._body_color,
-            stroke_width=3,
+            stroke_width=3 * scale,
             stroke_linecap="round"
         ))
         g_arms = lizard_group.add(dwg.g(
             fill=self._body_color,
             stroke=self._body_color,
-            stroke_width=6,
+            stroke_width=6 * scale,
             stroke_linecap="round"
         ))
         g_head = lizard_group.add(dwg.g(
             fill=self._body_color,
             stroke=self._body_color,
-            stroke_width=self.body_width[0],
+            stroke_width=self.body_width[0] * scale,
             stroke_linecap="round"
         ))
 
-        for poly_idx in range(len(self._frames_to_use[0]["body"])):
-            values = []
-            for f in range(self._n_frames):
-                pts = self._frames_to_use[f]["body"][poly_idx]
-                path_d = f"M{pts[0][0]:.2f},{pts[0][1]:.2f} "
-                path_d += " ".join(f"L{x:.2f},{y:.2f}" for x, y in pts[1:])
-                path_d += " Z"
-                values.append(path_d)
-            path = dwg.path(d=values[0])
-            path.add(animate.Animate(
-                "d",
-                dur=f"{self._duration:.2f}s",
-                values=";".join(values),
-                keyTimes=self._key_times_str,
-                fill="freeze",
-                repeatCount="indefinite"
-            ))
-            g_body.add(path)
-
-        for arm_idx in range(4):
-            values = []
-            for f in range(self._n_frames):
-                pts = self._frames_to_use[f]["arms"][arm_idx]
-                path_d = f"M{pts[0][0]:.2f},{pts[0][1]:.2f} "
-                path_d += " ".join(f"L{x:.2f},{y:.2f}" for x, y in pts[1:])
-                values.append(path_d)
-            path = dwg.path(d=values[0])
-            path.add(animate.Animate(
-                "d",
-                dur=f"{self._duration:.2f}s",
-                values=";".join(values),
-                keyTimes=self._key_times_str,
-                fill="freeze",
-                repeatCount="indefinite"
-            ))
-            g_arms.add(path)
-
-        values = []
-        for f in range(self._n_frames):
-            x, y = self._frames_to_use[f]["head"]
-            path_d = f"M{x:.2f},{y:.2f} L{x:.2f},{y:.2f}"
-            values.append(path_d)
-        head_path = dwg.path(d=values[0])
-        head_path.add(animate.Animate(
-            "d",
-            dur=f"{self._duration:.2f}s",
-            values=";".join(values),
-            keyTimes=self._key_times_str,
-            fill="freeze",
-            repeatCount="indefinite"
-        ))
-        g_head.add(head_path)
+        spine = self._track("spine")
+        arms = self._track("arms")
+
+        if self._body_mode == "quads":
+            quads = self._body_quads(spine)
+            paths = [
+                (g_body, quads[:, poly_idx], "M{},{} L{},{} L{},{} L{},{} Z")
+                for poly_idx in range(quads.shape[1])
+            ]
+        elif self._body_mode == "outline":
+            outline = self._body_outline(spine)
+            paths = [(
+                g_body, outline,
+                "M{},{}" + " L{},{}" * (outline.shape[1] - 1) + " Z"
+            )]
+        else:
+            outline = self._body_outline(spine)
+            paths = [(
+                g_body, self._smooth_outline(outline),
+                "M{},{}" + " Q{},{} {},{}" * outline.shape[1] + " Z"
+            )]
+
+        if self._limb_mode == "transform":
+            self._add_animated_paths(dwg, paths)
+            self._add_rigid_limbs(dwg, g_arms, g_head, spine, arms)
+            return lizard_group
+
+        paths += [
+            (g_arms, arms[:, 3 * arm_idx:3 * arm_idx + 3],
+             "M{},{} L{},{} L{},{}")
+            for arm_idx in range(len(self.arms))
+        ]
+        paths.append((g_head, spine[:, :1], "M{0},{1} L{0},{1}"))
+        self._add_animated_paths(dwg, paths)
 
         return lizard_group
 
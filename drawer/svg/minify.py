@@ -0,0 +1,127 @@
+import re
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Set
+
+if TYPE_CHECKING:
+    from .stream_writer import Element
+
+# attributes whose value is the default one, dropping them changes nothing
+_DEFAULT_ATTRIBUTES = {
+    "svg": {"baseProfile": "full", "xmlns:ev": None},
+    "style": {"type": "text/css"},
+    "rect": {"x": "0", "y": "0", "opacity": "1"},
+    "use": {"x": "0", "y": "0", "opacity": "1"},
+    "circle": {"cx": "0", "cy": "0"},
+    "line": {"x1": "0", "y1": "0", "x2": "0", "y2": "0"},
+    "animate": {"begin": "0s", "calcMode": "linear"},
+    "animateTransform": {
+        "begin": "0s", "calcMode": "linear", "additive": "replace"
+    },
+}
+
+_PATH_SPACES = re.compile(r" *([MLHVCSQTAZmlhvcsqtaz]) *")
+_REFERENCE = re.compile(r"url\(#([^)]+)\)")
+_CSS_ID = re.compile(r"#([A-Za-z][\w-]*)")
+
+
+def minify(root: 'Element') -> None:
+    """
+    Minifies in place the tree of :class:`~.stream_writer.Element` under
+    ``root``: default attributes are dropped, whitespace is collapsed and
+    removed around path commands, and ids are shortened, or removed when
+    nothing references them. Ids appearing in a style sheet are kept as is.
+    """
+    elements = list(_walk(root))
+    referenced: List[str] = []
+    kept: Set[str] = set()
+    for element in elements:
+        if element.cdata:
+            kept.update(_CSS_ID.findall(element.cdata))
+        for key, value in element.attribs.items():
+            if not isinstance(value, str):
+                continue
+            if key in ("xlink:href", "href") and value.startswith("#"):
+                referenced.append(value[1:])
+            referenced.extend(_REFERENCE.findall(value))
+
+    short_ids: Dict[str, str] = {}
+    index = 0
+    for name in dict.fromkeys(referenced):
+        if name in kept:
+            continue
+        while _short_id(index) in kept:
+            index += 1
+        short_ids[name] = _short_id(index)
+        index += 1
+
+    for element in elements:
+        _minify_element(element, short_ids, kept)
+
+
+def _walk(root: 'Element') -> Iterator['Element']:
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        yield element
+        stack.extend(reversed(element.elements))
+
+
+def _short_id(index: int) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    name = letters[index % len(letters)]
+    index //= len(letters)
+    while index:
+        index -= 1
+        name += letters[index % len(letters)]
+        index //= len(letters)
+    return name
+
+
+def _minify_element(
+        element: 'Element',
+        short_ids: Dict[str, str],
+        kept: Set[str]
+) -> None:
+    attribs = element.attribs
+    for key, default in _DEFAULT_ATTRIBUTES.get(element.name, {}).items():
+        if key in attribs and (
+                default is None or _to_string(attribs[key]) == default):
+            del attribs[key]
+
+    if "id" in attribs:
+        name = attribs["id"]
+        if name in short_ids:
+            attribs["id"] = short_ids[name]
+        elif name not in kept:
+            del attribs["id"]
+
+    is_path = element.name == "path" \
+        or attribs.get("attributeName") == "d"
+    for key, value in attribs.items():
+        if isinstance(value, str):
+            value = " ".join(value.split())
+            if key in ("xlink:href", "href") and value.startswith("#") \
+                    and value[1:] in short_ids:
+                value = "#" + short_ids[value[1:]]
+            elif "url(#" in value:
+                value = _REFERENCE.sub(
+                    lambda m: f"url(#{short_ids.get(m[1], m[1])})", value)
+            if is_path and key in ("d", "values"):
+                value = _compact_path(value)
+            attribs[key] = value
+        elif is_path and key == "values" \
+                and not isinstance(value, (int, float)):
+            attribs[key] = [_compact_path(item) for item in value]
+    if element.cdata:
+        element.cdata = " ".join(element.cdata.split())
+
+
+def _compact_path(d: Any) -> str:
+    return _PATH_SPACES.sub(r"\1", " ".join(str(d).split()))
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, Iterable) and not isinstance(value, str):
+        return ""
+    return str(value)
@@ -0,0 +1,81 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class NumberFormat:
+    """
+    Formats whole arrays of coordinates at once instead of one f-string per
+    number.\n
+
+    Coordinates are written with ``precision`` decimals, optionally without
+    their redundant trailing zeros. With ``grid`` they are instead quantized
+    to ``1 / grid`` pixel and written as integers, the element using them
+    has to be drawn in a group scaled by :attr:`transform`.
+    """
+
+    def __init__(
+            self,
+            precision: int = 2,
+            strip_zeros: bool = False,
+            grid: Optional[int] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        precision: `int`
+            Number of decimals
+        strip_zeros: `bool`
+            Remove the trailing zeros of the decimals
+        grid: `Optional[int]`
+            Write coordinates as integers on a grid of ``1 / grid`` pixel
+        """
+        if grid is not None and grid < 1:
+            raise ValueError("grid must be a positive integer")
+        self.precision = max(0, precision)
+        self.strip_zeros = strip_zeros
+        self.grid = grid
+        self._template = f"{{:.{self.precision}f}}".format
+
+    @property
+    def scale(self) -> int:
+        """
+        Factor applied to the coordinates, and to any length drawn in their
+        space such as stroke widths
+        """
+        return 1 if self.grid is None else self.grid
+
+    @property
+    def transform(self) -> Optional[str]:
+        """
+        Transform mapping the formatted coordinates back to pixels
+        """
+        if self.grid is None:
+            return None
+        return f"scale({1 / self.grid!r})"
+
+    def format(self, values: np.ndarray) -> List[str]:
+        """
+        Formatted ``values``, flattened in C order
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if self.grid is not None:
+            return list(map(str, np.rint(values * self.grid)
+                            .astype(np.int64).tolist()))
+        if not self.strip_zeros:
+            return list(map(self._template, values.tolist()))
+        # adding 0.0 turns the -0.0 left by rounding into 0.0
+        rounded = np.round(values, self.precision) + 0.0
+        formatted = map(self._template, rounded.tolist())
+        if not self.precision:
+            return list(formatted)
+        return [s.rstrip("0").rstrip(".") for s in formatted]
+
+    def format_rows(self, values: np.ndarray) -> List[Tuple[str, ...]]:
+        """
+        Formatted ``values`` of shape ``(rows, ...)``, grouped by row
+        """
+        values = np.asarray(values)
+        width = int(np.prod(values.shape[1:], dtype=np.int64))
+        flat = iter(self.format(values))
+        return list(zip(*[flat] * width))
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# block of shared memory attached by each worker of the pool
+_shared: Optional[shared_memory.SharedMemory] = None
+
+
+def map_tracks(
+        function: Callable[..., Any],
+        tasks: Sequence[Tuple[np.ndarray, Tuple[Any, ...]]],
+        workers: Optional[int] = None
+) -> List[Any]:
+    """
+    ``function(track, *args)`` for every ``(track, args)`` of ``tasks``, in
+    their order. With more than one of ``workers`` the calls are spread
+    over a pool of processes: the tracks are copied once to a block of
+    shared memory that every worker reads them from, only ``args`` and the
+    results being pickled. ``function`` has to be a module level function.
+    """
+    if workers is None or workers < 2 or len(tasks) < 2:
+        return [function(track, *args) for track, args in tasks]
+
+    tracks = [np.ascontiguousarray(track, dtype=np.float64)
+              for track, _ in tasks]
+    size = sum(track.nbytes for track in tracks)
+    shared = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        views = []
+        offset = 0
+        for track in tracks:
+            np.ndarray(
+                track.shape, np.float64, shared.buf, offset
+            )[...] = track
+            views.append((offset, track.shape))
+            offset += track.nbytes
+        with ProcessPoolExecutor(
+                min(workers, len(tasks)),
+                initializer=_attach,
+                initargs=(shared.name,)
+        ) as pool:
+            return list(pool.map(
+                _call,
+                [function] * len(tasks),
+                views,
+                [args for _, args in tasks]
+            ))
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _attach(name: str) -> None:
+    global _shared
+    _shared = shared_memory.SharedMemory(name=name)
+
+
+def _call(
+        function: Callable[..., Any],
+        view: Tuple[int, Tuple[int, ...]],
+        args: Tuple[Any, ...]
+) -> Any:
+    offset, shape = view
+    track = np.ndarray(shape, np.float64, _shared.buf, offset)
+    return function(track, *args)
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from .number_format import NumberFormat
+
+
+class RenderOptions:
+    """
+    How a simulated game is written to a file: all of them can change from
+    one render of the same simulation to the next, the simulation itself
+    being recorded once.
+    """
+    WRITERS = ("svgwrite", "stream")
+
+    def __init__(
+            self,
+            writer: str = "svgwrite",
+            number_format: Optional[NumberFormat] = None,
+            keyframe_error: Optional[float] = None,
+            spline_keyframes: bool = False,
+            map_backend: str = "smil",
+            bug_mode: str = "cells",
+            minify: bool = False,
+            compress_level: Optional[int] = None,
+            workers: Optional[int] = None,
+            output_dir: str = "./dist"
+    ) -> None:
+        """
+        Parameters
+        ----------
+        writer: `str`
+            ``"svgwrite"`` or ``"stream"`` for the streaming writer
+        number_format: `Optional[NumberFormat]`
+            Format of the coordinates of the lizard
+        keyframe_error: `Optional[float]`
+            Maximum error in pixels of the reduced keyframes, all the
+            keyframes being kept when ``None``
+        spline_keyframes: `bool`
+            Interpolate the reduced keyframes with splines
+        map_backend: `str`
+            ``"smil"`` or ``"css"`` animations of the map
+        bug_mode: `str`
+            How the bugs of the map are drawn
+        minify: `bool`
+            Minify the output, requires the stream writer
+        compress_level: `Optional[int]`
+            Gzip compression level of a ``.svgz`` output, plain SVG when
+            ``None``
+        workers: `Optional[int]`
+            Number of processes building the paths of the lizard
+        output_dir: `str`
+            Directory the files are written to
+        """
+        if writer not in self.WRITERS:
+            raise ValueError(f"Unknown SVG writer {writer!r}")
+        if minify and writer != "stream":
+            raise ValueError("minify requires the stream writer")
+        self.writer = writer
+        self.number_format = number_format
+        self.keyframe_error = keyframe_error
+        self.spline_keyframes = spline_keyframes
+        self.map_backend = map_backend
+        self.bug_mode = bug_mode
+        self.minify = minify
+        self.compress_level = compress_level
+        self.workers = workers
+        self.output_dir = output_dir
@@ -0,0 +1,245 @@
+import gzip
+import io
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .minify import minify as minify_tree
+
+_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ("\"", "&quot;"),
+    ("\n", "&#10;"),
+    ("\r", "&#13;"),
+    ("\t", "&#09;"),
+)
+
+
+def _escape(value: str) -> str:
+    for char, entity in _ESCAPES:
+        if char in value:
+            value = value.replace(char, entity)
+    return value
+
+
+def open_output(filename: str, compresslevel: Optional[int] = None) -> TextIO:
+    """
+    Opens ``filename`` for writing UTF-8 text, gzip compressed at
+    ``compresslevel`` if given. The gzip header holds no timestamp, so that
+    the same drawing always gives the same file.
+    """
+    if compresslevel is None:
+        return open(filename, "w", encoding="utf-8")
+    return io.TextIOWrapper(
+        gzip.GzipFile(filename, "wb", compresslevel=compresslevel, mtime=0),
+        encoding="utf-8"
+    )
+
+
+class Element:
+    """
+    Minimal SVG element, serialized with the same markup as svgwrite:
+    attribute names with ``_`` replaced by ``-``, sorted attributes, numbers
+    written with ``str`` and empty or ``None`` attributes omitted.\n
+
+    An attribute value that is a list (or any non string iterable) is
+    written item by item separated with ``;``, the way svgwrite joins
+    animation ``values``, without building the joined string.
+    """
+
+    __slots__ = ("name", "attribs", "elements", "cdata")
+
+    def __init__(self, name: str, **extra: Any) -> None:
+        self.name = name
+        self.attribs: Dict[str, Any] = {}
+        self.elements: List['Element'] = []
+        self.cdata = ""
+        self.update(extra)
+
+    def update(self, attribs: Dict[str, Any]) -> None:
+        for key, value in attribs.items():
+            self.attribs[key.rstrip("_").replace("_", "-")] = value
+
+    def __getitem__(self, key: str) -> Any:
+        return self.attribs[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.attribs[key] = value
+
+    def add(self, element: 'Element') -> 'Element':
+        self.elements.append(element)
+        return element
+
+    def write(self, f: TextIO) -> None:
+        write = f.write
+        write("<" + self.name)
+        for key, value in sorted(self.attribs.items()):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                if value:
+                    write(f' {key}="{_escape(value)}"')
+            elif isinstance(value, (int, float)):
+                write(f' {key}="{value}"')
+            else:
+                self._write_list(write, key, value)
+        if not self.elements and not self.cdata:
+            write(" />")
+            return
+        write(">")
+        for element in self.elements:
+            element.write(f)
+        if self.cdata:
+            write(f"<![CDATA[{self.cdata}]]>")
+        write(f"</{self.name}>")
+
+    @staticmethod
+    def _write_list(write, key: str, values: Iterable[Any]) -> None:
+        started = False
+        for value in values:
+            if value is None:
+                continue
+            write(";" if started else f' {key}="')
+            write(_escape(str(value)))
+            started = True
+        if started:
+            write("\"")
+
+    def tostring(self) -> str:
+        f = io.StringIO()
+        self.write(f)
+        return f.getvalue()
+
+
+class StreamDrawing(Element):
+    """
+    Drop in replacement of the parts of ``svgwrite.Drawing`` used by the
+    drawers. Elements are kept as lightweight :class:`Element` objects and
+    :meth:`save` streams them to the file without building an XML tree or
+    validating attributes, producing the same markup as svgwrite.
+    """
+
+    def __init__(
+            self,
+            filename: str = "noname.svg",
+            size: Tuple[Any, Any] = ("100%", "100%"),
+            **extra: Any
+    ) -> None:
+        """
+        Parameters
+        ----------
+        filename: `str`
+            File written by :meth:`save`
+        size: `Tuple[Any, Any]`
+            Width and height of the drawing
+        """
+        super().__init__("svg", width=size[0], height=size[1], **extra)
+        self.update({
+            "xmlns": "http://www.w3.org/2000/svg",
+            "xmlns:xlink": "http://www.w3.org/1999/xlink",
+            "xmlns:ev": "http://www.w3.org/2001/xml-events",
+            "baseProfile": "full",
+            "version": "1.1",
+        })
+        self.filename = filename
+        self.defs = self.add(Element("defs"))
+
+    def save(
+            self,
+            minify: bool = False,
+            compresslevel: Optional[int] = None
+    ) -> None:
+        """
+        Writes the drawing to :attr:`filename`, after the :func:`minify`
+        pass with ``minify`` and gzip compressed at ``compresslevel`` if
+        given
+        """
+        if minify:
+            minify_tree(self)
+        with open_output(self.filename, compresslevel) as f:
+            f.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+            self.write(f)
+
+    def g(self, **extra: Any) -> Element:
+        return Element("g", **extra)
+
+    def symbol(self, **extra: Any) -> Element:
+        return Element("symbol", **extra)
+
+    def style(self, content: str = "", **extra: Any) -> Element:
+        style = Element("style", **extra)
+        style["type"] = "text/css"
+        style.cdata = content
+        return style
+
+    def rect(
+            self,
+            insert: Tuple[Any, Any] = (0, 0),
+            size: Tuple[Any, Any] = (1, 1),
+            **extra: Any
+    ) -> Element:
+        return Element(
+            "rect",
+            x=insert[0],
+            y=insert[1],
+            width=size[0],
+            height=size[1],
+            **extra
+        )
+
+    def line(
+            self,
+            start: Tuple[Any, Any] = (0, 0),
+            end: Tuple[Any, Any] = (0, 0),
+            **extra: Any
+    ) -> Element:
+        return Element(
+            "line", x1=start[0], y1=start[1], x2=end[0], y2=end[1], **extra
+        )
+
+    def circle(
+            self,
+            center: Tuple[Any, Any] = (0, 0),
+            r: Any = 1,
+            **extra: Any
+    ) -> Element:
+        return Element("circle", cx=center[0], cy=center[1], r=r, **extra)
+
+    def path(self, d: Optional[str] = None, **extra: Any) -> Element:
+        return Element("path", d=d, **extra)
+
+    def use(
+            self,
+            href: str,
+            insert: Optional[Tuple[Any, Any]] = None,
+            size: Optional[Tuple[Any, Any]] = None,
+            **extra: Any
+    ) -> Element:
+        use = Element("use", **extra)
+        use["xlink:href"] = href
+        if insert is not None:
+            use["x"], use["y"] = insert
+        if size is not None:
+            use["width"], use["height"] = size
+        return use
+
+    def animate(
+            self,
+            attributeName: Optional[str] = None,
+            values: Any = None,
+            **extra: Any
+    ) -> Element:
+        return Element(
+            "animate", attributeName=attributeName, values=values, **extra
+        )
+
+    def animateTransform(
+            self,
+            transform: str,
+            element: Optional[str] = None,
+            **extra: Any
+    ) -> Element:
+        animation = self.animate(element, **extra)
+        animation.name = "animateTransform"
+        animation["type"] = transform
+        return animation
@@ -0,0 +1,57 @@
+from typing import Dict, List, Tuple
+
+from github_user_contrib import DailyContribution
+
+
+class TargetIndex:
+    """
+    Remaining contribution days, bucketed by contribution count. Each bucket
+    indexes its days by week and then by day, so the nearest day (Manhattan
+    distance over the ``(week, day)`` grid) with the highest remaining count
+    is found by scanning outwards from the current week, without sorting the
+    remaining targets. Ties are broken by week and then by day.
+    """
+
+    def __init__(self, days: List[DailyContribution]) -> None:
+        self._buckets: Dict[int, Dict[int, Dict[int, DailyContribution]]] = {}
+        for day in days:
+            self._buckets \
+                .setdefault(day.contributions, {}) \
+                .setdefault(day.week_number, {})[day.day_number] = day
+        self._counts = sorted(self._buckets)
+        self._size = len(days)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def pop_nearest(self, cell: Tuple[int, int]) -> DailyContribution:
+        """
+        Removes and returns the day with the highest contribution count that
+        is the nearest to ``cell``
+        """
+        if not self._size:
+            raise IndexError("pop from an empty TargetIndex")
+        count = self._counts[-1]
+        bucket = self._buckets[count]
+        tx, ty = cell
+        max_offset = max(abs(week - tx) for week in bucket)
+        best = None
+        for offset in range(max_offset + 1):
+            if best is not None and offset > best[0]:
+                break
+            for week in {tx - offset, tx + offset}:
+                for day in bucket.get(week, ()):
+                    key = (offset + abs(day - ty), week, day)
+                    if best is None or key < best:
+                        best = key
+
+        _, week, day = best
+        days = bucket[week]
+        target = days.pop(day)
+        if not days:
+            del bucket[week]
+            if not bucket:
+                del self._buckets[count]
+                self._counts.pop()
+        self._size -= 1
+        return target
@@ -1,10 +1,22 @@
+from .contribution_cache import ContributionCache
 from .daily_contribution import DailyContribution
-from .github_fetcher import GithubFetcher
+from .github_fetcher import (
+    GithubFetcher,
+    build_contributions_query,
+    create_session,
+    fetch_daily_contributions,
+    parse_contribution_calendar
+)
 from .weekly_contributions import WeeklyContributions
 
 
 __all__ = [
+    'ContributionCache',
     'DailyContribution',
     'WeeklyContributions',
     'GithubFetcher',
+    'build_contributions_query',
+    'create_session',
+    'fetch_daily_contributions',
+    'parse_contribution_calendar',
 ]
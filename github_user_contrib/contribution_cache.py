@@ -0,0 +1,185 @@
+import json
+import os
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .daily_contribution import DailyContribution, Quartile
+
+# fetch time and days of a cached calendar
+CachedCalendar = Tuple[float, List[DailyContribution]]
+
+_LEVELS = {quartile: level for level, quartile in Quartile.items()}
+
+
+class ContributionCache:
+    """
+    Contribution calendars stored per user as JSON files. A calendar older
+    than ``ttl`` is refreshed by fetching only its last ``refresh_days``,
+    the days before them never change, and merged back into the cached
+    history.\n
+
+    A calendar fetched as a whole keeps the levels computed by GitHub.
+    GitHub computes them within the fetched range though, so the levels of
+    a refreshed window cannot be compared with the cached ones: after a
+    merge the levels are recomputed over the whole calendar by
+    :func:`_levels`, which only approximates those of GitHub.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            ttl: float = 6 * 3600,
+            refresh_days: int = 7
+    ) -> None:
+        """
+        Parameters
+        ----------
+        directory: `str`
+            Directory holding a ``<user>.json`` file per user
+        ttl: `float`
+            Seconds during which a cached calendar is used as is
+        refresh_days: `int`
+            Number of last cached days fetched again to refresh a calendar
+        """
+        self._directory = directory
+        self._ttl = ttl
+        self._refresh_days = max(1, refresh_days)
+
+    def _path(self, user_name: str) -> str:
+        return os.path.join(self._directory, f"{user_name}.json")
+
+    def load(self, user_name: str) -> Optional[CachedCalendar]:
+        try:
+            with open(self._path(user_name)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        days = [
+            (date.fromisoformat(day[0]), day[1]) for day in cached["days"]
+        ]
+        levels = None
+        # the levels are missing from the files of older versions
+        if all(len(day) > 2 for day in cached["days"]):
+            levels = [day[2] for day in cached["days"]]
+        return cached["fetched_at"], _number_days(days, levels)
+
+    def save(self, user_name: str, days: List[DailyContribution]) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(user_name)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({
+                "fetched_at": time.time(),
+                "days": [
+                    [day.date.isoformat(), day.contributions, day.quartile]
+                    for day in days
+                ]
+            }, f, separators=(",", ":"))
+        # the cache is never left half written
+        os.replace(f"{path}.tmp", path)
+
+    def is_fresh(self, cached: CachedCalendar) -> bool:
+        return time.time() - cached[0] < self._ttl
+
+    def refresh_start(
+            self,
+            cached: Optional[CachedCalendar]
+    ) -> Optional[date]:
+        """
+        First day to fetch again to refresh ``cached``, ``None`` when the
+        whole calendar has to be fetched: nothing is cached, or the window
+        would start more than the year a query can span ago
+        """
+        if cached is None or not cached[1]:
+            return None
+        start = cached[1][-1].date - timedelta(days=self._refresh_days - 1)
+        if start <= _year_before(date.today()):
+            return None
+        return start
+
+    def update(
+            self,
+            user_name: str,
+            cached: Optional[CachedCalendar],
+            fetched: Optional[List[DailyContribution]],
+            since: Optional[date] = None
+    ) -> Optional[List[DailyContribution]]:
+        """
+        Merges the ``fetched`` days, starting on ``since`` or covering the
+        whole calendar when ``None``, into the ``cached`` calendar of
+        ``user_name`` and saves the result, renumbering the weeks so that
+        the calendar spans a year up to its last day. When nothing was
+        fetched the stale cached days are returned, if any.\n
+
+        A whole calendar is saved as fetched, with the levels of GitHub.
+        """
+        if fetched is None:
+            return None if cached is None else cached[1]
+        if since is None:
+            self.save(user_name, fetched)
+            return fetched
+        merged: Dict[date, int] = {}
+        if cached is not None:
+            merged.update((day.date, day.contributions) for day in cached[1])
+        merged.update((day.date, day.contributions) for day in fetched)
+        if not merged:
+            return fetched
+        first = _year_before(max(merged))
+        days = _number_days([
+            (day, count) for day, count in sorted(merged.items())
+            if day >= first
+        ])
+        self.save(user_name, days)
+        return days
+
+
+def _year_before(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+
+def _levels(counts: List[int]) -> List[int]:
+    """
+    Levels of the contribution ``counts`` of a calendar: 0 without
+    contributions, otherwise the quartile of the count among the days with
+    contributions
+    """
+    active = [count for count in counts if count > 0]
+    if len(active) < 2:
+        return [4 if count > 0 else 0 for count in counts]
+    quartiles = statistics.quantiles(active, n=4)
+    return [
+        0 if count == 0
+        else 1 + sum(count > quartile for quartile in quartiles)
+        for count in counts
+    ]
+
+
+def _number_days(
+        days: List[Tuple[date, int]],
+        levels: Optional[List[int]] = None
+) -> List[DailyContribution]:
+    """
+    Contributions of the sorted ``(date, count)`` days, numbered in weeks
+    starting on Sunday from the first one, with the given ``levels`` or
+    else those of :func:`_levels`
+    """
+    if not days:
+        return []
+    first = days[0][0]
+    sunday = first - timedelta(days=(first.weekday() + 1) % 7)
+    if levels is None:
+        levels = _levels([count for _, count in days])
+    return [
+        DailyContribution(
+            _date=day,
+            contributions=count,
+            week_number=(day - sunday).days // 7,
+            day_number=(day.weekday() + 1) % 7,
+            quartile=_LEVELS[level]
+        )
+        for (day, count), level in zip(days, levels)
+    ]
@@ -1,58 +1,329 @@
-from typing import List, Optional, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import List, Optional, Dict, Any, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from .contribution_cache import ContributionCache
 from .daily_contribution import DailyContribution
 from .weekly_contributions import WeeklyContributions
 
+# retries of a request hitting a rate limit, and the longest wait for the
+# limit to reset before giving up
+_RATE_LIMIT_RETRIES = 5
+_MAX_RATE_LIMIT_DELAY = 15 * 60
+
+
+def create_session(
+        retries: int = 5,
+        backoff_factor: float = 0.5,
+        pool_size: int = 10
+) -> requests.Session:
+    """
+    Session keeping up to ``pool_size`` connections alive, that retries a
+    request failing with a rate limit or server error up to ``retries``
+    times, waiting ``backoff_factor * 2 ** retry`` seconds between retries
+    unless the response asks for another delay with ``Retry-After``.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # the GraphQL queries only read data, retrying them is safe
+        allowed_methods=None,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
 
 class GithubFetcher:
-    def __init__(self, user_name: str, token: str) -> None:
+    def __init__(
+            self,
+            user_name: str,
+            token: str,
+            session: Optional[requests.Session] = None,
+            timeout: float = 30,
+            cache: Optional[ContributionCache] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        user_name: `str`
+            Login of the user whose contributions are fetched
+        token: `str`
+            GitHub token used to query the GraphQL API
+        session: `Optional[requests.Session]`
+            Session sending the requests, a new one from
+            :func:`create_session` by default
+        timeout: `float`
+            Seconds to wait for the server to connect and to respond
+        cache: `Optional[ContributionCache]`
+            Cache of the calendars, only the recent days of a cached
+            calendar are fetched and its stale days are used when the API
+            cannot be reached
+        """
         self._user_name = user_name
         self._token = token
+        self._session = session if session is not None else create_session()
+        self._timeout = timeout
+        self._cache = cache
 
-    def _get_contribution_graph(self) -> Optional[Dict[str, Any]]:
-        url = "https://api.github.com/graphql"
-        query = f"""
-            query {{
-              user(login: "{self._user_name}") {{
-                contributionsCollection {{
+    def _get_contribution_graph(
+            self,
+            since: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        return _post_query(
+            self._session,
+            self._token,
+            build_contributions_query([self._user_name], since),
+            self._timeout
+        )
+
+    def get_daily_contributions(self) -> Optional[List[DailyContribution]]:
+        if self._cache is None:
+            return self._fetch()
+        cached = self._cache.load(self._user_name)
+        if cached is not None and self._cache.is_fresh(cached):
+            return cached[1]
+        since = self._cache.refresh_start(cached)
+        try:
+            days = self._fetch(since)
+        except requests.RequestException:
+            if cached is None:
+                raise
+            days = None
+        return self._cache.update(self._user_name, cached, days, since)
+
+    def _fetch(
+            self,
+            since: Optional[date] = None
+    ) -> Optional[List[DailyContribution]]:
+        response = self._get_contribution_graph(since)
+        if response is None:
+            return None
+        user = (response.get("data") or {}).get("u0")
+        if user is None:
+            return None
+        return parse_contribution_calendar(
+            user["contributionsCollection"]["contributionCalendar"])
+
+
+def build_contributions_query(
+        user_names: List[str],
+        since: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Body of a single GraphQL request fetching the contribution calendars
+    of every user of ``user_names``, aliased ``u0``, ``u1``... in order.
+    Only the first day of each week and the count and level of each day
+    are selected, the other fields being derived from them by
+    :func:`parse_contribution_calendar`.\n
+
+    With ``since`` the calendars only go from that day up to now, instead
+    of the last year.
+    """
+    aliases = [f"u{i}" for i in range(len(user_names))]
+    variables: Dict[str, Any] = dict(zip(aliases, user_names))
+    parameters = [f"${alias}: String!" for alias in aliases]
+    window = ""
+    if since is not None:
+        parameters += ["$from: DateTime!", "$to: DateTime!"]
+        window = "(from: $from, to: $to)"
+        variables["from"] = f"{since.isoformat()}T00:00:00Z"
+        variables["to"] = datetime.now(timezone.utc) \
+            .strftime("%Y-%m-%dT%H:%M:%SZ")
+    selections = "".join(
+        f"""
+              {alias}: user(login: ${alias}) {{
+                contributionsCollection{window} {{
                   contributionCalendar {{
                     weeks {{
+                      firstDay
                       contributionDays {{
-                        date
-                        weekday
                         contributionCount
                         contributionLevel
                       }}
                     }}
                   }}
                 }}
-              }}
-            }}
-        """
-        headers = {
-            "Authorization": f"bearer {self._token}"
-        }
-        r = requests.post(url, json={"query": query}, headers=headers)
-        if r.status_code == 200:
-            return r.json()
-        return None
+              }}"""
+        for alias in aliases
+    )
+    return {
+        "query": f"query({', '.join(parameters)}) {{{selections}\n}}",
+        "variables": variables
+    }
 
-    def get_daily_contributions(self) -> Optional[List[DailyContribution]]:
-        response = self._get_contribution_graph()
-        if response is None:
+
+def parse_contribution_calendar(
+        calendar: Dict[str, Any]
+) -> List[DailyContribution]:
+    """
+    Daily contributions of a ``contributionCalendar`` of the GraphQL API
+    """
+    weeks = [
+        WeeklyContributions(
+            week.get("contributionDays"), i, week.get("firstDay"))
+        for i, week in enumerate(calendar.get("weeks"))
+    ]
+    days = []
+    for week in weeks:
+        days.extend(week.contribution_stats)
+    return days
+
+
+def _post_query(
+        session: requests.Session,
+        token: str,
+        body: Dict[str, Any],
+        timeout: float
+) -> Optional[Dict[str, Any]]:
+    """
+    Response of the GraphQL API to ``body``, ``None`` on failure. A request
+    hitting a rate limit is sent again once the limit allows it, see
+    :func:`_rate_limit_delay`.
+    """
+    headers = {
+        "Authorization": f"bearer {token}"
+    }
+    for attempt in range(_RATE_LIMIT_RETRIES + 1):
+        r = session.post(
+            "https://api.github.com/graphql",
+            json=body,
+            headers=headers,
+            timeout=timeout
+        )
+        response = r.json() if r.status_code == 200 else None
+        delay = _rate_limit_delay(r, response, attempt)
+        if delay is None:
+            return response
+        if attempt == _RATE_LIMIT_RETRIES or delay > _MAX_RATE_LIMIT_DELAY:
             return None
-        contributions = response \
-            .get("data") \
-            .get("user") \
-            .get("contributionsCollection") \
-            .get("contributionCalendar")
-        weeks = [
-            WeeklyContributions(week.get('contributionDays'), i)
-            for i, week in enumerate(contributions.get("weeks"))
+        time.sleep(delay)
+    return None
+
+
+def _rate_limit_delay(
+        r: requests.Response,
+        response: Optional[Dict[str, Any]],
+        attempt: int
+) -> Optional[float]:
+    """
+    Seconds to wait before sending again a request rate limited by GitHub,
+    ``None`` if it was not. GitHub answers a rate limited request with a
+    403 or 429 carrying ``Retry-After`` or an exhausted
+    ``x-ratelimit-remaining``, or with a GraphQL error of type
+    ``RATE_LIMITED``. The wait follows ``Retry-After``, then the reset time
+    of the limit, and falls back to an exponential backoff.
+    """
+    if response is not None:
+        errors = response.get("errors") or []
+        if not any(error.get("type") == "RATE_LIMITED" for error in errors):
+            return None
+    elif r.status_code not in (403, 429) or (
+            "retry-after" not in r.headers
+            and r.headers.get("x-ratelimit-remaining") != "0"):
+        return None
+    if "retry-after" in r.headers:
+        try:
+            return max(0.0, float(r.headers["retry-after"]))
+        except ValueError:
+            pass
+    if r.headers.get("x-ratelimit-remaining") == "0" \
+            and "x-ratelimit-reset" in r.headers:
+        return max(0.0, float(r.headers["x-ratelimit-reset"]) - time.time())
+    return float(2 ** attempt)
+
+
+def fetch_daily_contributions(
+        user_names: List[str],
+        token: str,
+        workers: int = 8,
+        session: Optional[requests.Session] = None,
+        batch_size: int = 10,
+        timeout: float = 30,
+        cache: Optional[ContributionCache] = None
+) -> Dict[str, Optional[List[DailyContribution]]]:
+    """
+    Daily contributions of every user of ``user_names``. The users are
+    packed by ``batch_size`` in a single request each, see
+    :func:`build_contributions_query`, sent by up to ``workers`` threads
+    sharing the connections of ``session``. A user whose contributions
+    could not be fetched maps to ``None``.\n
+
+    With ``cache`` the users whose cached calendar is fresh are not
+    fetched, and the users with a cached history of the last year are
+    batched together to fetch only their recent days, see
+    :class:`ContributionCache`.
+    """
+    if session is None:
+        session = create_session(pool_size=workers)
+    batch_size = max(1, batch_size)
+
+    contributions: Dict[str, Optional[List[DailyContribution]]] = {}
+    cached = {}
+    for user_name in user_names:
+        entry = None if cache is None else cache.load(user_name)
+        if entry is not None and cache.is_fresh(entry):
+            contributions[user_name] = entry[1]
+        else:
+            cached[user_name] = entry
+
+    starts = {
+        user_name: None if cache is None else cache.refresh_start(entry)
+        for user_name, entry in cached.items()
+    }
+    batches: List[Tuple[List[str], Optional[date]]] = []
+    for windowed in (False, True):
+        pending = [
+            user_name for user_name, start in starts.items()
+            if (start is not None) == windowed
+        ]
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            since = min(
+                starts[user_name] for user_name in batch
+            ) if windowed else None
+            batches.append((batch, since))
+
+    def fetch(
+            batch: Tuple[List[str], Optional[date]]
+    ) -> List[Optional[List[DailyContribution]]]:
+        names, since = batch
+        try:
+            response = _post_query(
+                session,
+                token,
+                build_contributions_query(names, since),
+                timeout
+            )
+        except requests.RequestException:
+            response = None
+        # a missing user is null in data, next to an entry in errors
+        data = (response or {}).get("data") or {}
+        users = [data.get(f"u{i}") for i in range(len(names))]
+        return [
+            None if user is None else parse_contribution_calendar(
+                user["contributionsCollection"]["contributionCalendar"])
+            for user in users
         ]
-        days = []
-        for week in weeks:
-            days.extend(week.contribution_stats)
-        return days
+
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        for (batch, _), days in zip(batches, pool.map(fetch, batches)):
+            for user_name, fetched in zip(batch, days):
+                if cache is not None:
+                    fetched = cache.update(
+                        user_name, cached[user_name], fetched,
+                        starts[user_name])
+                contributions[user_name] = fetched
+    return {user_name: contributions[user_name] for user_name in user_names}
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional
 
 from .daily_contribution import DailyContribution
 
@@ -7,16 +8,30 @@ class WeeklyContributions:
     def __init__(
             self,
             contribution_stats: List[Dict[str, Any]],
-            week_number: int
+            week_number: int,
+            first_day: Optional[str] = None
     ) -> None:
+        """
+        The ``date`` and ``weekday`` of the days, consecutive from
+        ``first_day``, are derived from it when they were not fetched
+        """
         self.contribution_stats = []
         self._week_number = week_number
-        for day in contribution_stats:
+        if first_day is not None:
+            start = date.fromisoformat(first_day)
+            # weekdays of the API start on Sunday
+            first_weekday = (start.weekday() + 1) % 7
+        for i, day in enumerate(contribution_stats):
+            if "date" in day:
+                _date, weekday = day["date"], day["weekday"]
+            else:
+                _date = start + timedelta(days=i)
+                weekday = first_weekday + i
             daily_contrib = DailyContribution(
-                _date=day["date"],
+                _date=_date,
                 contributions=day["contributionCount"],
                 week_number=week_number,
-                day_number=day['weekday'],
+                day_number=weekday,
                 quartile=day["contributionLevel"],
             )
             self.contribution_stats.append(daily_contrib)
@@ -1,20 +1,98 @@
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 
+from drawer.svg import RenderOptions
 from drawer.svg.contribution_game_svg import ContributionGameSVG
+from github_user_contrib import (
+    ContributionCache,
+    DailyContribution,
+    fetch_daily_contributions
+)
+
+
+def read_user_names(argument: str) -> List[str]:
+    """
+    Users named by ``argument``: a comma separated list of logins, or
+    ``@path`` to a file holding one login per line
+    """
+    if argument.startswith("@"):
+        with open(argument[1:]) as f:
+            names = f.read().split()
+    else:
+        names = argument.split(",")
+    return [name.strip() for name in names if name.strip()]
+
+
+def render_user(
+        user_name: str,
+        days: List[DailyContribution],
+        lizard_color: Optional[str],
+        themes: List[str],
+        output_dir: str
+) -> List[str]:
+    game = ContributionGameSVG(
+        user_name,
+        "",
+        lizard_color=lizard_color,
+        render_options=RenderOptions(output_dir=output_dir),
+        days=days
+    )
+    game.simulate()
+    return [game.render(theme) for theme in themes]
 
 
 def main():
-    user_name = sys.argv[1]
+    user_names = read_user_names(sys.argv[1])
     token = sys.argv[2]
-    lizard_color = sys.argv[3] if len(sys.argv) > 3 else None
-
-    for theme in ["light", "dark"]:
-        ContributionGameSVG(
-            user_name,
-            token,
-            theme,
-            lizard_color=lizard_color
-        ).run()
+    lizard_color = (sys.argv[3] or None) if len(sys.argv) > 3 else None
+    # "auto" writes a single file following the color scheme of the viewer
+    themes = sys.argv[4].split(",") if len(sys.argv) > 4 else ["light", "dark"]
+    # calendars are cached between runs in LIZARD_CACHE_DIR if set
+    cache_dir = os.environ.get("LIZARD_CACHE_DIR")
+    cache = None
+    if cache_dir:
+        cache = ContributionCache(
+            cache_dir, float(os.environ.get("LIZARD_CACHE_TTL", 6 * 3600)))
+
+    if len(user_names) == 1:
+        game = ContributionGameSVG(
+            user_names[0], token, lizard_color=lizard_color, cache=cache)
+        game.simulate()
+        for theme in themes:
+            game.render(theme)
+        return
+
+    # batch mode: every user is rendered in its own directory of dist
+    calendars = fetch_daily_contributions(user_names, token, cache=cache)
+    with ProcessPoolExecutor() as pool:
+        futures = {
+            user_name: pool.submit(
+                render_user,
+                user_name,
+                days,
+                lizard_color,
+                themes,
+                os.path.join("dist", user_name)
+            )
+            for user_name, days in calendars.items()
+            if days is not None
+        }
+    failed = False
+    for user_name, days in calendars.items():
+        if days is None:
+            print(f"{user_name}: contributions could not be fetched",
+                  file=sys.stderr)
+        elif futures[user_name].exception() is not None:
+            print(f"{user_name}: {futures[user_name].exception()!r}",
+                  file=sys.stderr)
+        else:
+            continue
+        failed = True
+    if failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,16 @@
+from .array_chain import ArrayChain
 from .chain import Chain
+from .chain_batch import ChainBatch
+from .clock import SimulationClock
 from .utils import constrain_distance, constrain_angle
 from .vector import Vector
 
 
 __all__ = [
+    "ArrayChain",
     "Chain",
+    "ChainBatch",
+    "SimulationClock",
     "Vector",
     "constrain_angle",
     "constrain_distance"
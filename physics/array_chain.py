@@ -0,0 +1,249 @@
+import math
+import secrets
+import string
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from physics.two_bone import two_bone_resolve
+from physics.utils import constrain_angle
+from physics.vector import Vector
+
+
+class ArrayChain:
+    """
+    Array backed counterpart of :class:`physics.Chain`. Joints are stored as
+    an ``(n, 2)`` float64 array and angles as an ``(n,)`` float64 array, both
+    updated in place, so resolving the chain does not allocate a `Vector` per
+    joint. With ``trig_free`` the angular constraint is applied on unit
+    direction vectors, and ``angles`` is only derived from them when read.
+    ``fabrik_resolve`` iterates from the current pose until the first joint
+    is within ``tolerance`` of its target, three joint chains are solved in
+    closed form instead:\n
+
+    ``┌───l₀───┬───l₁───┬──lₙ₋₁──┐
+    ×────────×────────×───//───×
+    j₀       j₁       j₂  //   jₙ``\n
+
+    Attributes
+    ----------
+    joints : np.ndarray
+        Array of joints of shape ``(joint_count, 2)``
+    angles : np.ndarray
+        Array of angles of shape ``(joint_count,)``
+    iterations : int
+        Number of FABRIK iterations run by the last ``fabrik_resolve`` call
+    """
+
+    def __init__(
+            self,
+            origin: Vector,
+            joint_count: int,
+            link_size: Union[float, List[float]],
+            angle_constraint: float = -1,
+            trig_free: bool = False,
+            tolerance: float = 1e-1,
+            max_iterations: int = 10,
+            bend: int = 0
+    ) -> None:
+        """
+        Parameters
+        ----------
+        origin: `Vector`
+            Origin of the chain
+        joint_count: `int`
+            Number of joints
+        link_size: `float` or `list` [`float`]
+            Size of the linkages, If defined as a float, all linkages will have
+            the same length, if defined as a list of size `len(join_count)-1`,
+            each bar will have its respective length
+        angle_constraint: `float`
+            Angle constraint of the chain, if not defined, it is assumed that there
+            is no restriction
+        trig_free: `bool`
+            Resolve with dot and cross product tests and a precomputed rotation
+            by ``±angle_constraint`` instead of ``atan2``, ``cos`` and ``sin``
+        tolerance: `float`
+            Distance to the target below which FABRIK is considered converged
+        max_iterations: `int`
+            Maximum number of FABRIK iterations per call
+        bend: `int`
+            Side of a three joint chain elbow, ``1`` counterclockwise, ``-1``
+            clockwise or ``0`` to keep the current side
+        """
+        if isinstance(link_size, Union[int, float]):
+            link_size = [link_size] * (joint_count - 1)
+        elif len(link_size) == 1:
+            link_size = [link_size[0]] * (joint_count - 1)
+        self._link_size = np.array(link_size, dtype=np.float64)
+        self._links = self._link_size.tolist()
+        self._reach = sum(self._links[:joint_count - 1])
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.iterations = 0
+        self.bend = bend
+        self._angle_constraint = angle_constraint
+        self._trig_free = trig_free
+        self._cos_constraint = math.cos(angle_constraint)
+        self._sin_constraint = math.sin(angle_constraint)
+        self._angles_stale = False
+        self._id = ''.join(
+            secrets.choice(string.ascii_letters + string.digits)
+            for _ in range(5)
+        )
+        self.joints = np.zeros((joint_count, 2), dtype=np.float64)
+        self._angles = np.zeros(joint_count, dtype=np.float64)
+        self._directions = ([1.0] * joint_count, [0.0] * joint_count)
+        self.joints[:, 0] = origin.x
+        self.joints[0, 1] = origin.y
+        self.joints[1:, 1] = origin.y + np.cumsum(
+            self._link_size[:joint_count - 1])
+
+    def __len__(self) -> int:
+        return self.joints.shape[0]
+
+    @property
+    def angles(self) -> np.ndarray:
+        if self._angles_stale:
+            ux, uy = self._directions
+            np.arctan2(uy, ux, out=self._angles)
+            self._angles_stale = False
+        return self._angles
+
+    @angles.setter
+    def angles(self, angles: np.ndarray) -> None:
+        self._angles = angles
+        self._angles_stale = False
+
+    def joint(self, i: int) -> Vector:
+        """
+        Returns a copy of the ``i``-th joint as a `Vector`
+        """
+        x, y = self.joints[i].tolist()
+        return Vector(x, y)
+
+    def resolve(self, pos: Vector) -> None:
+        if self._trig_free:
+            self._resolve_directions(pos)
+            return
+        xs, ys = self.joints.T.tolist()
+        angles = self.angles.tolist()
+        links = self._links
+        constrained = self._angle_constraint > 0
+        angles[0] = math.atan2(pos.y - ys[0], pos.x - xs[0])
+        xs[0], ys[0] = pos.x, pos.y
+        for i in range(1, len(xs)):
+            current_angle = math.atan2(ys[i - 1] - ys[i], xs[i - 1] - xs[i])
+            if i > 1 and constrained:
+                current_angle = constrain_angle(
+                    current_angle, angles[i - 1], self._angle_constraint
+                )
+            angles[i] = current_angle
+            xs[i] = xs[i - 1] - math.cos(current_angle) * links[i - 1]
+            ys[i] = ys[i - 1] - math.sin(current_angle) * links[i - 1]
+        self.joints[:, 0] = xs
+        self.joints[:, 1] = ys
+        self.angles[:] = angles
+
+    def _resolve_directions(self, pos: Vector) -> None:
+        xs, ys = self.joints.T.tolist()
+        ux, uy = self._directions
+        links = self._links
+        constrained = self._angle_constraint > 0
+        cos_c, sin_c = self._cos_constraint, self._sin_constraint
+        ux[0], uy[0] = _unit(pos.x - xs[0], pos.y - ys[0])
+        xs[0], ys[0] = pos.x, pos.y
+        px, py = ux[0], uy[0]
+        for i in range(1, len(xs)):
+            x, y = xs[i - 1], ys[i - 1]
+            dx, dy = x - xs[i], y - ys[i]
+            mag = math.sqrt(dx * dx + dy * dy)
+            if mag == 0:
+                dx, dy = 1.0, 0.0
+            else:
+                dx, dy = dx / mag, dy / mag
+            if constrained and i > 1 and px * dx + py * dy < cos_c:
+                if px * dy - py * dx > 0:
+                    dx, dy = px * cos_c - py * sin_c, px * sin_c + py * cos_c
+                else:
+                    dx, dy = px * cos_c + py * sin_c, py * cos_c - px * sin_c
+            ux[i], uy[i] = px, py = dx, dy
+            link = links[i - 1]
+            xs[i] = x - dx * link
+            ys[i] = y - dy * link
+        self.joints[:, 0] = xs
+        self.joints[:, 1] = ys
+        self._angles_stale = True
+
+    def fabrik_resolve(self, pos: Vector, anchor: Vector) -> int:
+        """
+        “FABRIK”, or “Forwards and Backwards Reaching Inverse Kinematics”.
+        The first joint reaches for ``pos`` while the last one is pinned to
+        ``anchor``, starting from the current (previous frame) pose, or with
+        :func:`physics.two_bone.two_bone_resolve` for three joints. Returns
+        the number of iterations run, ``0`` when the pose already satisfies
+        both targets.
+        """
+        xs, ys = self.joints.T.tolist()
+        links = self._links
+        tolerance = self.tolerance
+        last = len(xs) - 1
+        if math.hypot(xs[0] - pos.x, ys[0] - pos.y) <= tolerance and \
+                math.hypot(xs[-1] - anchor.x, ys[-1] - anchor.y) <= tolerance:
+            self.iterations = 0
+            return 0
+
+        if last == 2:
+            (xs[0], ys[0]), (xs[1], ys[1]) = two_bone_resolve(
+                (xs[0], ys[0]), (xs[1], ys[1]), (anchor.x, anchor.y),
+                (pos.x, pos.y), links[0], links[1], self.bend
+            )
+            xs[2], ys[2] = anchor.x, anchor.y
+            iterations = 1
+        elif math.hypot(pos.x - anchor.x, pos.y - anchor.y) >= self._reach:
+            xs[-1], ys[-1] = anchor.x, anchor.y
+            for i in range(last - 1, -1, -1):
+                xs[i], ys[i] = _constrain_distance(
+                    pos.x, pos.y, xs[i + 1], ys[i + 1], links[i])
+            iterations = 1
+        else:
+            iterations = 0
+            while iterations < self.max_iterations:
+                iterations += 1
+                xs[0], ys[0] = pos.x, pos.y
+                for i in range(1, last + 1):
+                    xs[i], ys[i] = _constrain_distance(
+                        xs[i], ys[i], xs[i - 1], ys[i - 1], links[i - 1])
+
+                xs[-1], ys[-1] = anchor.x, anchor.y
+                for i in range(last - 1, -1, -1):
+                    xs[i], ys[i] = _constrain_distance(
+                        xs[i], ys[i], xs[i + 1], ys[i + 1], links[i])
+                if math.hypot(xs[0] - pos.x, ys[0] - pos.y) <= tolerance:
+                    break
+        self.joints[:, 0] = xs
+        self.joints[:, 1] = ys
+        self.iterations = iterations
+        return iterations
+
+
+def _constrain_distance(
+        x: float,
+        y: float,
+        anchor_x: float,
+        anchor_y: float,
+        constraint: float
+) -> Tuple[float, float]:
+    dx, dy = x - anchor_x, y - anchor_y
+    mag = math.hypot(dx, dy)
+    if mag == 0:
+        return anchor_x, anchor_y
+    scale = constraint / mag
+    return anchor_x + dx * scale, anchor_y + dy * scale
+
+
+def _unit(dx: float, dy: float) -> Tuple[float, float]:
+    mag = math.hypot(dx, dy)
+    if mag == 0:
+        return 1.0, 0.0
+    return dx / mag, dy / mag
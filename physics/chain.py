@@ -97,4 +97,4 @@ class Chain:
         self.joints[-1] = anchor
         for i in range(len(self.joints) - 2, -1, -1):
             self.joints[i] = constrain_distance(
-                self.joints[i], self.joints[i + 1], self._link_size[i - 1])
+                self.joints[i], self.joints[i + 1], self._link_size[i])
@@ -0,0 +1,198 @@
+import math
+from typing import List
+
+import numpy as np
+
+from physics.array_chain import ArrayChain
+from physics.two_bone import two_bone_resolve, two_bone_resolve_batch
+
+# below this many chains, solving three joint chains one by one is faster
+# than the array operations of two_bone_resolve_batch (measured crossover
+# between 8 and 16 chains)
+_TWO_BONE_BATCH_MIN = 12
+
+
+class ChainBatch:
+    """
+    Stack of :class:`ArrayChain` with the same number of joints that are
+    resolved together, with array operations over the chain axis instead of
+    a Python loop per chain.\n
+
+    The joints and angles of every chain become views of the batch storage,
+    so the chains stay usable (and drawable) on their own after being
+    batched.
+
+    Attributes
+    ----------
+    joints : np.ndarray
+        Array of joints of shape ``(chain_count, joint_count, 2)``
+    angles : np.ndarray
+        Array of angles of shape ``(chain_count, joint_count)``
+    iterations : np.ndarray
+        FABRIK iterations run per chain by the last ``fabrik_resolve`` call
+    """
+
+    def __init__(self, chains: List[ArrayChain]) -> None:
+        """
+        Parameters
+        ----------
+        chains: `list` [`ArrayChain`]
+            Chains to resolve together, all of them with the same number of
+            joints
+        """
+        if not chains:
+            raise ValueError("At least one chain is required")
+        joint_count = len(chains[0])
+        if any(len(chain) != joint_count for chain in chains):
+            raise ValueError("All chains must have the same number of joints")
+        self.chains = chains
+        self.joints = np.stack([chain.joints for chain in chains])
+        self.angles = np.stack([chain.angles for chain in chains])
+        self._link_size = np.stack([
+            chain._link_size[:joint_count - 1] for chain in chains
+        ])
+        self._angle_constraint = np.array([
+            chain._angle_constraint for chain in chains
+        ], dtype=np.float64)
+        self._reach = self._link_size.sum(axis=1)
+        self.tolerance = np.array([chain.tolerance for chain in chains])
+        self.max_iterations = max(chain.max_iterations for chain in chains)
+        self.iterations = np.zeros(len(chains), dtype=np.int64)
+        self.bend = np.array([chain.bend for chain in chains])
+        for k, chain in enumerate(chains):
+            chain.joints = self.joints[k]
+            chain.angles = self.angles[k]
+
+    def __len__(self) -> int:
+        return self.joints.shape[0]
+
+    def resolve(self, pos: np.ndarray) -> None:
+        """
+        Vectorized :meth:`ArrayChain.resolve`, ``pos`` has shape
+        ``(chain_count, 2)``
+        """
+        joints, angles = self.joints, self.angles
+        for chain in self.chains:
+            chain._angles_stale = False
+        constrained = self._angle_constraint > 0
+        delta = pos - joints[:, 0]
+        angles[:, 0] = np.arctan2(delta[:, 1], delta[:, 0])
+        joints[:, 0] = pos
+        for i in range(1, joints.shape[1]):
+            delta = joints[:, i - 1] - joints[:, i]
+            current_angle = np.arctan2(delta[:, 1], delta[:, 0])
+            if i > 1 and constrained.any():
+                current_angle = np.where(
+                    constrained,
+                    _constrain_angles(
+                        current_angle,
+                        angles[:, i - 1],
+                        self._angle_constraint
+                    ),
+                    current_angle
+                )
+            angles[:, i] = current_angle
+            link = self._link_size[:, i - 1]
+            joints[:, i, 0] = joints[:, i - 1, 0] - np.cos(current_angle) * link
+            joints[:, i, 1] = joints[:, i - 1, 1] - np.sin(current_angle) * link
+
+    def fabrik_resolve(self, pos: np.ndarray, anchor: np.ndarray) -> None:
+        """
+        Vectorized :meth:`ArrayChain.fabrik_resolve`, ``pos`` and ``anchor``
+        have shape ``(chain_count, 2)``. Chains leave the iteration as soon
+        as they converge, and chains that already satisfy both targets are
+        not touched at all, reporting ``0`` iterations. The three joint
+        chains left are solved at once with
+        :func:`physics.two_bone.two_bone_resolve_batch` when there are
+        enough of them to pay for its array operations, one by one with
+        :func:`physics.two_bone.two_bone_resolve` otherwise.
+        """
+        joints = self.joints
+        iterations = np.zeros(len(self), dtype=np.int64)
+        active = (_distances(joints[:, 0], pos) > self.tolerance) | \
+            (_distances(joints[:, -1], anchor) > self.tolerance)
+        if joints.shape[1] == 3:
+            idx = np.flatnonzero(active)
+            if len(idx) >= _TWO_BONE_BATCH_MIN:
+                sub = joints[idx]
+                two_bone_resolve_batch(
+                    sub, pos[idx], anchor[idx],
+                    self._link_size[idx], self.bend[idx])
+                joints[idx] = sub
+            else:
+                for k in idx.tolist():
+                    (x, y), elbow = two_bone_resolve(
+                        joints[k, 0].tolist(), joints[k, 1].tolist(),
+                        anchor[k].tolist(), pos[k].tolist(),
+                        *self._link_size[k].tolist(), int(self.bend[k])
+                    )
+                    joints[k] = ((x, y), elbow, anchor[k])
+            iterations[idx] = 1
+            self._set_iterations(iterations)
+            return
+
+        unreachable = active & (_distances(pos, anchor) >= self._reach)
+        if unreachable.any():
+            idx = np.flatnonzero(unreachable)
+            stretched = joints[idx]
+            stretched[:, -1] = anchor[idx]
+            for i in range(joints.shape[1] - 2, -1, -1):
+                stretched[:, i] = _constrain_distances(
+                    pos[idx], stretched[:, i + 1], self._link_size[idx, i])
+            joints[idx] = stretched
+            iterations[idx] = 1
+            active &= ~unreachable
+
+        for _ in range(self.max_iterations):
+            if not active.any():
+                break
+            idx = np.flatnonzero(active)
+            sub = joints[idx]
+            link_size = self._link_size[idx]
+            sub[:, 0] = pos[idx]
+            for i in range(1, joints.shape[1]):
+                sub[:, i] = _constrain_distances(
+                    sub[:, i], sub[:, i - 1], link_size[:, i - 1])
+
+            sub[:, -1] = anchor[idx]
+            for i in range(joints.shape[1] - 2, -1, -1):
+                sub[:, i] = _constrain_distances(
+                    sub[:, i], sub[:, i + 1], link_size[:, i])
+            joints[idx] = sub
+            iterations[idx] += 1
+            active[idx] = _distances(sub[:, 0], pos[idx]) > self.tolerance[idx]
+        self._set_iterations(iterations)
+
+    def _set_iterations(self, iterations: np.ndarray) -> None:
+        self.iterations = iterations
+        for chain, count in zip(self.chains, iterations.tolist()):
+            chain.iterations = count
+
+
+def _distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.hypot(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1])
+
+
+def _constrain_distances(
+        pos: np.ndarray,
+        anchor: np.ndarray,
+        constraint: np.ndarray
+) -> np.ndarray:
+    delta = pos - anchor
+    mag = np.hypot(delta[:, 0], delta[:, 1])
+    mag[mag == 0] = 1
+    return anchor + delta * (constraint / mag)[:, None]
+
+
+def _constrain_angles(
+        angle: np.ndarray,
+        anchor: np.ndarray,
+        constraint: np.ndarray
+) -> np.ndarray:
+    diff = math.pi - np.mod(angle + math.pi - anchor, math.tau)
+    constrained = np.where(
+        np.abs(diff) <= constraint,
+        angle,
+        np.where(diff > constraint, anchor - constraint, anchor + constraint)
+    )
+    return np.mod(constrained, math.tau)
@@ -0,0 +1,71 @@
+from typing import List
+
+
+class SimulationClock:
+    """
+    Fixed timestep clock that decouples the physics tick rate from the rate
+    at which keyframes are recorded. Each tick can optionally be split into
+    ``substeps`` smaller physics steps.\n
+
+    ``tick`` advances the clock by one physics tick and returns, for every
+    keyframe instant that falls within that tick, the interpolation factor
+    between the state at the previous tick (``0``) and the current one
+    (``1``).
+    """
+
+    def __init__(
+            self,
+            tick_rate: float = 30,
+            keyframe_rate: float = 10,
+            substeps: int = 1
+    ) -> None:
+        """
+        Parameters
+        ----------
+        tick_rate: `float`
+            Physics ticks per second
+        keyframe_rate: `float`
+            Recorded keyframes per second
+        substeps: `int`
+            Physics steps per tick
+        """
+        if tick_rate <= 0 or keyframe_rate <= 0 or substeps < 1:
+            raise ValueError("Rates must be positive and substeps at least 1")
+        self.tick_rate = tick_rate
+        self.keyframe_rate = keyframe_rate
+        self.substeps = substeps
+        self.dt = 1.0 / tick_rate
+        self._ticks_per_keyframe = tick_rate / keyframe_rate
+        self.ticks = 0
+        self._keyframes = 0
+
+    @property
+    def time(self) -> float:
+        return self.ticks * self.dt
+
+    @property
+    def aligned(self) -> bool:
+        """
+        Whether every keyframe instant falls exactly on a tick, in which case
+        no interpolation is needed
+        """
+        return float(self._ticks_per_keyframe).is_integer()
+
+    def start(self) -> List[float]:
+        """
+        Resets the clock, returns the interpolation factor of the keyframe at
+        time ``0``
+        """
+        self.ticks = 0
+        self._keyframes = 1
+        return [1.0]
+
+    def tick(self) -> List[float]:
+        self.ticks += 1
+        alphas = []
+        position = self._keyframes * self._ticks_per_keyframe
+        while position <= self.ticks + 1e-9:
+            alphas.append(min(1.0, position - (self.ticks - 1)))
+            self._keyframes += 1
+            position = self._keyframes * self._ticks_per_keyframe
+        return alphas
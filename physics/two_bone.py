@@ -0,0 +1,100 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+
+def two_bone_resolve(
+        effector: Tuple[float, float],
+        elbow: Tuple[float, float],
+        anchor: Tuple[float, float],
+        target: Tuple[float, float],
+        effector_link: float,
+        anchor_link: float,
+        bend: int = 0
+) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    """
+    Closed form inverse kinematics of a two bone limb pinned at ``anchor``
+    whose free end reaches for ``target``, solved with the law of cosines.\n
+
+    ``bend`` selects the side of the ``anchor → target`` line the elbow
+    lies on, ``1`` for counterclockwise, ``-1`` for clockwise, and ``0`` to
+    keep the side of the current ``elbow``. Unreachable targets are
+    approached as far as the limb allows.\n
+
+    Returns the new effector and elbow positions.
+    """
+    ax, ay = anchor
+    dx, dy = target[0] - ax, target[1] - ay
+    dist = math.hypot(dx, dy)
+    if dist == 0:
+        dx, dy = effector[0] - ax, effector[1] - ay
+        norm = math.hypot(dx, dy)
+        dx, dy = (dx / norm, dy / norm) if norm != 0 else (1.0, 0.0)
+    else:
+        dx, dy = dx / dist, dy / dist
+    dist = min(
+        max(dist, abs(effector_link - anchor_link)),
+        effector_link + anchor_link
+    )
+    if bend == 0:
+        cross = dx * (elbow[1] - ay) - dy * (elbow[0] - ax)
+        bend = -1 if cross < 0 else 1
+    if dist == 0:
+        cos_a = 1.0
+    else:
+        cos_a = (anchor_link ** 2 + dist ** 2 - effector_link ** 2) \
+            / (2 * anchor_link * dist)
+        cos_a = min(1.0, max(-1.0, cos_a))
+    sin_a = bend * math.sqrt(1 - cos_a ** 2)
+    ex = ax + anchor_link * (dx * cos_a - dy * sin_a)
+    ey = ay + anchor_link * (dy * cos_a + dx * sin_a)
+    return (ax + dx * dist, ay + dy * dist), (ex, ey)
+
+
+def two_bone_resolve_batch(
+        joints: np.ndarray,
+        target: np.ndarray,
+        anchor: np.ndarray,
+        link_size: np.ndarray,
+        bend: np.ndarray
+) -> None:
+    """
+    Vectorized :func:`two_bone_resolve` over a stack of three joint chains,
+    updating ``joints`` of shape ``(chain_count, 3, 2)`` in place. ``target``
+    and ``anchor`` have shape ``(chain_count, 2)``, ``link_size`` has shape
+    ``(chain_count, 2)`` and ``bend`` has shape ``(chain_count,)``.
+    """
+    effector_link, anchor_link = link_size[:, 0], link_size[:, 1]
+    direction = target - anchor
+    dist = np.hypot(direction[:, 0], direction[:, 1])
+    still = dist == 0
+    if still.any():
+        direction[still] = joints[still, 0] - anchor[still]
+    norm = np.hypot(direction[:, 0], direction[:, 1])
+    direction[norm == 0] = (1.0, 0.0)
+    norm[norm == 0] = 1.0
+    direction /= norm[:, None]
+    dist = np.clip(
+        dist,
+        np.abs(effector_link - anchor_link),
+        effector_link + anchor_link
+    )
+
+    elbow = joints[:, 1] - anchor
+    cross = direction[:, 0] * elbow[:, 1] - direction[:, 1] * elbow[:, 0]
+    bend = np.where(bend == 0, np.where(cross < 0, -1, 1), bend)
+    safe_dist = np.where(dist == 0, 1.0, dist)
+    cos_a = np.where(
+        dist == 0,
+        1.0,
+        (anchor_link ** 2 + dist ** 2 - effector_link ** 2)
+        / (2 * anchor_link * safe_dist)
+    )
+    cos_a = np.clip(cos_a, -1.0, 1.0)
+    sin_a = bend * np.sqrt(1 - cos_a ** 2)
+    dx, dy = direction[:, 0], direction[:, 1]
+    joints[:, 2] = anchor
+    joints[:, 1, 0] = anchor[:, 0] + anchor_link * (dx * cos_a - dy * sin_a)
+    joints[:, 1, 1] = anchor[:, 1] + anchor_link * (dy * cos_a + dx * sin_a)
+    joints[:, 0] = anchor + direction * dist[:, None]